@@ -0,0 +1,220 @@
+import argparse
+import csv
+import json
+import os
+import random
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from main import ENEMY_TYPES, FPS, HexMap, MAP_RADIUS, TOWER_TYPES
+from simulation import BuildStep, Simulation, load_build_order
+
+
+@dataclass(frozen=True)
+class BatchTask:
+    layout: str
+    build_order: Tuple[BuildStep, ...]
+    replicate: int
+    seed: int
+    max_waves: Optional[int]
+    dt: float
+    vectorized: bool
+    pathing: str = "flow"
+    tower_overrides: Tuple[Tuple[str, Tuple[Tuple[str, float], ...]], ...] = ()
+    enemy_overrides: Tuple[Tuple[str, Tuple[Tuple[str, float], ...]], ...] = ()
+
+
+RESULT_FIELDS = [
+    "layout",
+    "replicate",
+    "seed",
+    "waves_survived",
+    "cleared",
+    "lives",
+    "money",
+    "peak_money",
+    "kills",
+    "leaks",
+    "towers",
+    "sim_seconds",
+    "wall_seconds",
+]
+
+
+def task_seed(base_seed: int, layout: str, replicate: int) -> int:
+    return zlib.crc32(f"{base_seed}:{layout}:{replicate}".encode("utf-8"))
+
+
+def freeze_overrides(overrides: Dict[str, Dict[str, float]]) -> Tuple[Tuple[str, Tuple[Tuple[str, float], ...]], ...]:
+    return tuple(sorted((key, tuple(sorted(fields.items()))) for key, fields in overrides.items()))
+
+
+def apply_overrides(types: Dict, overrides: Tuple[Tuple[str, Tuple[Tuple[str, float], ...]], ...]) -> Dict:
+    updated = dict(types)
+    for key, fields in overrides:
+        updated[key] = replace(updated[key], **dict(fields))
+    return updated
+
+
+def run_task(task: BatchTask) -> Dict[str, object]:
+    start = time.perf_counter()
+    simulation = Simulation(
+        task.build_order,
+        seed=task.seed,
+        dt=task.dt,
+        vectorized=task.vectorized,
+        pathing=task.pathing,
+        tower_types=apply_overrides(TOWER_TYPES, task.tower_overrides),
+        enemy_types=apply_overrides(ENEMY_TYPES, task.enemy_overrides),
+    )
+    outcomes = simulation.run(task.max_waves)
+    game = simulation.game
+    survived = sum(1 for outcome in outcomes if outcome.lives > 0)
+    return {
+        "layout": task.layout,
+        "replicate": task.replicate,
+        "seed": task.seed,
+        "waves_survived": survived,
+        "cleared": bool(outcomes) and survived == len(outcomes) and not game.wave_manager.active,
+        "lives": max(game.lives, 0),
+        "money": game.money,
+        "peak_money": max((outcome.money for outcome in outcomes), default=game.money),
+        "kills": game.kills,
+        "leaks": sum(outcome.leaks for outcome in outcomes),
+        "towers": len(game.towers),
+        "sim_seconds": round(sum(outcome.duration for outcome in outcomes), 3),
+        "wall_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def random_layout(rng: random.Random, tower_count: int, max_ring: int, last_wave: int) -> Tuple[BuildStep, ...]:
+    coords = [
+        (q, r)
+        for q in range(-max_ring, max_ring + 1)
+        for r in range(-max_ring, max_ring + 1)
+        if 1 <= HexMap.hex_distance((q, r), (0, 0)) <= max_ring
+    ]
+    keys = list(TOWER_TYPES.keys())
+    chosen = rng.sample(coords, min(tower_count, len(coords)))
+    steps = [BuildStep(rng.randint(1, last_wave), coord, rng.choice(keys)) for coord in chosen]
+    return tuple(sorted(steps, key=lambda step: step.wave))
+
+
+def build_tasks(
+    layouts: Dict[str, Tuple[BuildStep, ...]],
+    replicates: int,
+    base_seed: int,
+    max_waves: Optional[int],
+    dt: float,
+    vectorized: bool,
+    pathing: str,
+    tower_overrides: Dict[str, Dict[str, float]],
+    enemy_overrides: Dict[str, Dict[str, float]],
+) -> List[BatchTask]:
+    frozen_towers = freeze_overrides(tower_overrides)
+    frozen_enemies = freeze_overrides(enemy_overrides)
+    return [
+        BatchTask(
+            layout=name,
+            build_order=build_order,
+            replicate=replicate,
+            seed=task_seed(base_seed, name, replicate),
+            max_waves=max_waves,
+            dt=dt,
+            vectorized=vectorized,
+            pathing=pathing,
+            tower_overrides=frozen_towers,
+            enemy_overrides=frozen_enemies,
+        )
+        for name, build_order in layouts.items()
+        for replicate in range(replicates)
+    ]
+
+
+def run_batch(tasks: List[BatchTask], workers: Optional[int] = None) -> List[Dict[str, object]]:
+    if workers == 1:
+        return [run_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_task, tasks, chunksize=max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))))
+
+
+def write_results(rows: List[Dict[str, object]], path: Path) -> None:
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def summarize(rows: List[Dict[str, object]]) -> List[Tuple[str, float, float, int]]:
+    grouped: Dict[str, List[Dict[str, object]]] = {}
+    for row in rows:
+        grouped.setdefault(str(row["layout"]), []).append(row)
+    summary = [
+        (
+            layout,
+            sum(int(row["waves_survived"]) for row in items) / len(items),
+            sum(int(row["money"]) for row in items) / len(items),
+            len(items),
+        )
+        for layout, items in grouped.items()
+    ]
+    summary.sort(key=lambda item: (-item[1], -item[2], item[0]))
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel Hex Tower Defense build-order evaluation")
+    parser.add_argument("--layouts", type=Path, nargs="*", default=[], help="build order JSON files")
+    parser.add_argument("--random-layouts", type=int, default=0)
+    parser.add_argument("--random-towers", type=int, default=8)
+    parser.add_argument("--random-ring", type=int, default=3)
+    parser.add_argument("--random-last-wave", type=int, default=20)
+    parser.add_argument("--replicates", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--waves", type=int, default=None)
+    parser.add_argument("--dt", type=float, default=1 / FPS)
+    parser.add_argument("--vectorized", action="store_true")
+    parser.add_argument("--pathing", choices=("flow", "line"), default="flow")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--tower-overrides", type=json.loads, default={}, help='e.g. {"basic": {"damage": 24}}')
+    parser.add_argument("--enemy-overrides", type=json.loads, default={}, help='e.g. {"tank": {"hp": 150}}')
+    parser.add_argument("--output", type=Path, default=Path("batch_results.csv"))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    layouts: Dict[str, Tuple[BuildStep, ...]] = {path.stem: tuple(load_build_order(path)) for path in args.layouts}
+    layout_rng = random.Random(args.seed)
+    for index in range(args.random_layouts):
+        layouts[f"random-{index:05d}"] = random_layout(
+            layout_rng, args.random_towers, min(args.random_ring, MAP_RADIUS), args.random_last_wave
+        )
+    if not layouts:
+        parser.error("provide --layouts or --random-layouts")
+
+    tasks = build_tasks(
+        layouts,
+        args.replicates,
+        args.seed,
+        args.waves,
+        args.dt,
+        args.vectorized,
+        args.pathing,
+        args.tower_overrides,
+        args.enemy_overrides,
+    )
+    start = time.perf_counter()
+    rows = run_batch(tasks, args.workers)
+    elapsed = time.perf_counter() - start
+    write_results(rows, args.output)
+    print(f"Ran {len(tasks)} simulations in {elapsed:.1f}s; results written to {args.output}")
+    print(f"{'layout':<20} {'avg waves':>10} {'avg money':>10} {'runs':>5}")
+    for layout, waves, money, runs in summarize(rows)[: args.top]:
+        print(f"{layout:<20} {waves:>10.2f} {money:>10.1f} {runs:>5}")
+
+
+if __name__ == "__main__":
+    main()
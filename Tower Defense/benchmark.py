@@ -0,0 +1,335 @@
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from main import ENEMY_TYPES, MAP_RADIUS, TARGETING_MODES, TOWER_TYPES, Enemy, FrameProfiler, Game, HexMap, SpatialGrid, Tower
+
+
+def linear_find_target(self: Tower, enemies: SpatialGrid) -> Optional[Enemy]:
+    closest = None
+    closest_dist = float("inf")
+    for enemy in enemies.locations:
+        dist = pygame.Vector2(enemy.rect.center).distance_to(self.rect.center)
+        if dist <= self.range and dist < closest_dist:
+            closest = enemy
+            closest_dist = dist
+    return closest
+
+
+def linear_try_attack_towers(self: Enemy, game: Game) -> None:
+    if not game.towers:
+        return
+    closest = None
+    closest_dist = float("inf")
+    for tower in game.towers:
+        dist = pygame.Vector2(tower.rect.center).distance_to(self.rect.center)
+        if dist < closest_dist:
+            closest = tower
+            closest_dist = dist
+    if closest is None:
+        return
+    if closest_dist <= self.enemy_type.melee_range and self.melee_timer >= self.enemy_type.melee_cooldown:
+        closest.take_damage(self.enemy_type.melee_damage)
+        self.melee_timer = 0.0
+    elif closest_dist <= self.enemy_type.ranged_range and self.ranged_timer >= self.enemy_type.ranged_cooldown:
+        closest.take_damage(self.enemy_type.ranged_damage)
+        self.ranged_timer = 0.0
+
+
+def build_full_map(game: Game, targeting: Optional[str] = None) -> None:
+    keys = list(TOWER_TYPES.keys())
+    for i, tile in enumerate(game.hex_map.tiles.values()):
+        if not tile.buildable:
+            continue
+        tower = Tower(tile, TOWER_TYPES[keys[i % len(keys)]])
+        tower.max_hp = tower.hp = 10 ** 9
+        if targeting is not None:
+            tower.targeting = targeting
+        tile.tower = tower
+        game.towers.add(tower)
+    game.hex_map.flow_field.rebuild()
+
+
+def populate(game: Game, enemy_count: int, rng: random.Random) -> None:
+    enemy_keys = list(ENEMY_TYPES.keys())
+    for _ in range(enemy_count):
+        path = game.hex_map.path_from_border_to_base()
+        enemy = Enemy(path, ENEMY_TYPES[rng.choice(enemy_keys)], hp_multiplier=10 ** 6)
+        enemy.current_index = rng.randrange(len(path) - 1)
+        enemy.target = path[enemy.current_index]
+        enemy.pos = pygame.Vector2(enemy.target)
+        enemy.rect.center = enemy.pos
+        enemy.game = game
+        game.enemies.add(enemy)
+        game.enemy_grid.insert(enemy)
+
+
+MODES = ("scan", "grid", "vector")
+
+
+def measure(enemy_count: int, ticks: int, mode: str, seed: int, targeting: Optional[str] = None) -> float:
+    random.seed(seed)
+    game = Game(vectorized=mode == "vector")
+    game.state = "playing"
+    game.lives = 10 ** 9
+    build_full_map(game, targeting)
+    populate(game, enemy_count, random.Random(seed))
+    original = (Tower.find_target, Enemy.try_attack_towers)
+    if mode == "scan":
+        Tower.find_target = linear_find_target
+        Enemy.try_attack_towers = linear_try_attack_towers
+    try:
+        dt = 1 / 60
+        start = time.perf_counter()
+        for _ in range(ticks):
+            game.update(dt)
+        elapsed = time.perf_counter() - start
+    finally:
+        Tower.find_target, Enemy.try_attack_towers = original
+    return elapsed / ticks * 1000
+
+
+def measure_render(enemy_count: int, frames: int, dirty: bool, seed: int) -> Tuple[float, float]:
+    random.seed(seed)
+    game = Game(dirty_rendering=dirty)
+    game.state = "playing"
+    game.lives = 10 ** 9
+    build_full_map(game)
+    populate(game, enemy_count, random.Random(seed))
+    dt = 1 / 60
+    game.draw()
+    wall = cpu = 0.0
+    for _ in range(frames):
+        game.update(dt)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        game.draw()
+        cpu += time.process_time() - cpu_start
+        wall += time.perf_counter() - wall_start
+    return wall / frames * 1000, cpu / frames * 1000
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    tower_keys: Tuple[str, ...]
+    tower_count: int
+    enemy_keys: Tuple[str, ...]
+    enemy_count: int
+    map_radius: int = MAP_RADIUS
+    wave: Optional[int] = None
+
+
+def build_scenarios(towers: int, enemies: int) -> List[Scenario]:
+    scenarios = [
+        Scenario(f"{tower_key}-vs-{enemy_key}", (tower_key,), towers, (enemy_key,), enemies)
+        for tower_key in TOWER_TYPES
+        for enemy_key in ENEMY_TYPES
+    ]
+    scenarios.append(Scenario("mixed", tuple(TOWER_TYPES), towers, tuple(ENEMY_TYPES), enemies))
+    scenarios.append(Scenario("max-radius", tuple(TOWER_TYPES), towers * 4, tuple(ENEMY_TYPES), enemies * 4, map_radius=14))
+    scenarios.append(Scenario("wave-300", tuple(TOWER_TYPES), towers * 2, (), 0, wave=300))
+    scenarios.append(Scenario("wave-500", tuple(TOWER_TYPES), towers * 2, (), 0, wave=500))
+    return scenarios
+
+
+def setup_scenario(scenario: Scenario, seed: int, ticks: int) -> Game:
+    random.seed(seed)
+    game = Game(map_radius=scenario.map_radius)
+    game.state = "playing"
+    game.lives = 10 ** 9
+    game.profiler = FrameProfiler(window=ticks)
+    game.profiler.enabled = True
+    tiles = sorted(
+        (tile for tile in game.hex_map.tiles.values() if tile.buildable),
+        key=lambda tile: HexMap.hex_distance(tile.coord, game.hex_map.base_coord),
+    )
+    for i, tile in enumerate(tiles[2 : 2 + scenario.tower_count]):
+        tower = Tower(tile, TOWER_TYPES[scenario.tower_keys[i % len(scenario.tower_keys)]])
+        tower.max_hp = tower.hp = 10 ** 9
+        tower.game = game
+        tile.tower = tower
+        game.towers.add(tower)
+        game.tower_changed(tower)
+    rng = random.Random(seed)
+    for i in range(scenario.enemy_count):
+        path = game.hex_map.path_from_border_to_base()
+        enemy = Enemy(path, ENEMY_TYPES[scenario.enemy_keys[i % len(scenario.enemy_keys)]], hp_multiplier=10 ** 6)
+        enemy.current_index = rng.randrange(len(path) - 1)
+        enemy.target = path[enemy.current_index]
+        enemy.pos = pygame.Vector2(enemy.target)
+        enemy.rect.center = enemy.pos
+        enemy.game = game
+        game.enemies.add(enemy)
+        game.enemy_grid.insert(enemy)
+    if scenario.wave is not None:
+        game.wave_manager.current_wave = scenario.wave - 2
+        game.wave_manager.start_next_wave()
+    return game
+
+
+def run_scenario(scenario: Scenario, ticks: int, seed: int) -> Dict:
+    game = setup_scenario(scenario, seed, ticks)
+    dt = 1 / 60
+    update_time = draw_time = 0.0
+    peak_enemies = 0
+    for _ in range(ticks):
+        start = time.perf_counter()
+        game.update(dt)
+        middle = time.perf_counter()
+        game.draw()
+        update_time += middle - start
+        draw_time += time.perf_counter() - middle
+        game.profiler.end_frame()
+        peak_enemies = max(peak_enemies, len(game.enemies))
+    sections = {}
+    for name in game.profiler.sections:
+        samples = list(game.profiler.samples[name])
+        if not any(samples):
+            continue
+        p50, p95, p99 = game.profiler.percentiles(name)
+        sections[name] = {"mean_ms": statistics.fmean(samples), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+    return {
+        **asdict(scenario),
+        "ticks": ticks,
+        "towers": len(game.towers),
+        "peak_enemies": peak_enemies,
+        "ticks_per_sec": ticks / update_time,
+        "tick_ms": update_time / ticks * 1000,
+        "draw_ms": draw_time / ticks * 1000,
+        "sections": sections,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(towers: int, enemies: int, ticks: int, seed: int, names: Optional[List[str]]) -> Dict:
+    results = [
+        run_scenario(scenario, ticks, seed)
+        for scenario in build_scenarios(towers, enemies)
+        if not names or scenario.name in names
+    ]
+    return {"revision": git_revision(), "seed": seed, "ticks": ticks, "scenarios": results}
+
+
+def measure_memory(count: int, seed: int) -> Tuple[float, float]:
+    random.seed(seed)
+    game = Game(headless=True)
+    game.state = "playing"
+    enemy_keys = list(ENEMY_TYPES)
+    rng = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        enemies = []
+        for i in range(count):
+            enemy = game.enemy_pool.acquire(
+                game.hex_map.path_from_border_to_base(), ENEMY_TYPES[enemy_keys[i % len(enemy_keys)]], hp_multiplier=1.5
+            )
+            enemy.game = game
+            game.enemies.add(enemy)
+            game.enemy_grid.insert(enemy)
+            enemies.append(enemy)
+        middle = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            target = enemies[rng.randrange(count)]
+            game.projectiles.add(game.projectile_pool.acquire((640.0, 450.0), target, 10.0, 300.0, game))
+        end = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (middle - start) / count, (end - middle) / count
+
+
+def run_targeting(
+    counts: List[int], ticks: int, seed: int, modes: List[str], targeting: Optional[str] = None
+) -> List[Tuple[int, List[float]]]:
+    return [(count, [measure(count, ticks, mode, seed, targeting) for mode in modes]) for count in counts]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hex Tower Defense targeting and rendering benchmark")
+    parser.add_argument("--counts", type=int, nargs="+", default=[20, 100, 250, 500, 1000])
+    parser.add_argument("--ticks", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--targeting", choices=TARGETING_MODES, help="targeting priority for every tower")
+    parser.add_argument("--render", action="store_true", help="compare full-frame and dirty-rect drawing")
+    parser.add_argument("--memory", action="store_true", help="measure bytes per live enemy and projectile")
+    parser.add_argument("--suite", action="store_true", help="run the canned scaling scenarios")
+    parser.add_argument("--scenarios", nargs="+", help="only run these suite scenarios")
+    parser.add_argument("--towers", type=int, default=12, help="towers per suite scenario")
+    parser.add_argument("--enemies", type=int, default=60, help="enemies per suite scenario")
+    parser.add_argument("--json", type=Path, help="write suite results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="suite JSON from another commit to compare against")
+    args = parser.parse_args()
+    if args.memory:
+        print(f"{'entities':>8} {'enemy bytes':>12} {'projectile bytes':>17}")
+        for count in args.counts:
+            enemy_bytes, projectile_bytes = measure_memory(count, args.seed)
+            print(f"{count:>8} {enemy_bytes:>12.0f} {projectile_bytes:>17.0f}")
+        pygame.quit()
+        return
+    if args.suite:
+        report = run_suite(args.towers, args.enemies, args.ticks, args.seed, args.scenarios)
+        baseline = {}
+        if args.baseline:
+            baseline = {row["name"]: row for row in json.loads(args.baseline.read_text(encoding="utf-8"))["scenarios"]}
+        print(f"{'scenario':<20} {'towers':>7} {'enemies':>8} {'ticks/s':>9} {'tick ms':>8} {'draw ms':>8}")
+        for row in report["scenarios"]:
+            line = (
+                f"{row['name']:<20} {row['towers']:>7} {row['peak_enemies']:>8} {row['ticks_per_sec']:>9.0f} "
+                f"{row['tick_ms']:>8.3f} {row['draw_ms']:>8.3f}"
+            )
+            previous = baseline.get(row["name"])
+            if previous is not None:
+                line += (
+                    f"  tick {row['tick_ms'] / previous['tick_ms'] - 1:+7.1%}"
+                    f"  draw {row['draw_ms'] / previous['draw_ms'] - 1:+7.1%}"
+                )
+            print(line)
+        if args.json:
+            args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        pygame.quit()
+        return
+    if args.render:
+        print(f"{'enemies':>8} {'full ms':>9} {'full cpu':>9} {'full fps':>9} {'dirty ms':>9} {'dirty cpu':>10} {'dirty fps':>10}")
+        for count in args.counts:
+            full_ms, full_cpu = measure_render(count, args.ticks, False, args.seed)
+            dirty_ms, dirty_cpu = measure_render(count, args.ticks, True, args.seed)
+            print(
+                f"{count:>8} {full_ms:>9.3f} {full_cpu:>9.3f} {1000 / full_ms:>9.0f} "
+                f"{dirty_ms:>9.3f} {dirty_cpu:>10.3f} {1000 / dirty_ms:>10.0f}"
+            )
+        pygame.quit()
+        return
+    rows = run_targeting(args.counts, args.ticks, args.seed, args.modes, args.targeting)
+    print(f"{'enemies':>8}" + "".join(f"{mode + ' ms/tick':>16}" for mode in args.modes))
+    for count, timings in rows:
+        print(f"{count:>8}" + "".join(f"{ms:>16.3f}" for ms in timings))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,61 @@
+import heapq
+import json
+import marshal
 import math
 import random
+import struct
 import sys
-from dataclasses import dataclass
+import time
+from collections import OrderedDict, deque
+from dataclasses import MISSING, dataclass, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, get_type_hints
 
 import pygame
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 WIDTH, HEIGHT = 1280, 900
 FPS = 60
-HEX_SIZE = 44
-MAP_RADIUS = 7
+TICK_RATE = 60
+MAX_FRAME_TIME = 0.25
 MAP_OFFSET = (WIDTH // 2, HEIGHT // 2 + 20)
+BLOCKED_TILE_COST = 20
+CHAIN_FALLOFF = 0.7
+TARGETING_MODES = ("closest", "first", "strongest", "weakest", "fastest")
+SLOW_FIELD_CELL_SIZE = 16
+MAX_DIRTY_RECTS = 80
+TEXT_CACHE_SIZE = 256
+WAVE_CACHE_SIZE = 8
+MAX_SPAWNS_PER_TICK = 32
+TOTAL_WAVES = 600
+PROFILE_WINDOW = 240
+PROFILE_REFRESH_FRAMES = 15
+PROFILE_SECTIONS = ("waves", "enemies", "towers", "projectiles", "map", "sprites", "health", "ui", "dirty")
+HEX_DIRECTIONS = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
+HEX_CORNERS = tuple((math.cos(math.radians(60 * i - 30)), math.sin(math.radians(60 * i - 30))) for i in range(6))
 FONT_NAME = "arial"
+BACKGROUND_COLOR = (15, 20, 35)
+SNAPSHOT_MAGIC = b"TDSV"
+SNAPSHOT_VERSION = 3
+SNAPSHOT_HEADER = struct.Struct("<4sHB")
+SNAPSHOT_GAME = struct.Struct("<qqqQB")
+SNAPSHOT_WAVES = struct.Struct("<id?iidid")
+SNAPSHOT_TOWER = struct.Struct("<bbBBBdd")
+SNAPSHOT_ENEMY = struct.Struct("<BBidddddqdqdd")
+SNAPSHOT_PROJECTILE = struct.Struct("<idddddId")
+SNAPSHOT_RNG = struct.Struct("<625I?d")
+SNAPSHOT_COUNT = struct.Struct("<I")
+SNAPSHOT_ENDLESS = 1
+GAME_DATA_PATH = Path(__file__).with_name("game_data.json")
+GAME_DATA_CACHE_MAGIC = b"TDGD"
+GAME_DATA_CACHE_VERSION = 1
+GAME_DATA_CACHE_HEADER = struct.Struct("<4sHqq")
 MUSIC_FILES = {
     "menu": "start-272637.mp3",
     "game": "warrior-defense-fighting-music-335681.mp3",
@@ -33,13 +75,7 @@ class Tile:
 
     def polygon(self, size: float) -> List[Tuple[float, float]]:
         cx, cy = self.center
-        points = []
-        for i in range(6):
-            angle = math.radians(60 * i - 30)
-            x = cx + size * math.cos(angle)
-            y = cy + size * math.sin(angle)
-            points.append((x, y))
-        return points
+        return [(cx + size * cos, cy + size * sin) for cos, sin in HEX_CORNERS]
 
     def draw(self, surface: pygame.Surface, size: float, highlight: bool = False) -> None:
         if self.is_path:
@@ -54,6 +90,105 @@ class Tile:
         pygame.draw.polygon(surface, border_color, points, 2)
 
 
+class FlowField:
+    def __init__(self, hex_map: "HexMap"):
+        self.hex_map = hex_map
+        self.costs: Dict[Tuple[int, int], float] = {}
+        self.distances: Dict[Tuple[int, int], float] = {}
+        self.next_hops: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {}
+        self.center_coords: Dict[Tuple[float, float], Tuple[int, int]] = {}
+        self.version = 0
+        self.rebuild()
+
+    def neighbors(self, coord: Tuple[int, int]) -> List[Tuple[int, int]]:
+        q, r = coord
+        tiles = self.hex_map.tiles
+        return [(q + dq, r + dr) for dq, dr in HEX_DIRECTIONS if (q + dq, r + dr) in tiles]
+
+    def tile_cost(self, coord: Tuple[int, int]) -> float:
+        if coord == self.hex_map.base_coord:
+            return 0.0
+        return 1.0 if self.hex_map.tiles[coord].tower is None else float(BLOCKED_TILE_COST)
+
+    def best_neighbor(self, coord: Tuple[int, int]) -> Tuple[float, Optional[Tuple[int, int]]]:
+        best_dist = math.inf
+        best = None
+        for neighbor in self.neighbors(coord):
+            if self.distances[neighbor] < best_dist:
+                best_dist = self.distances[neighbor]
+                best = neighbor
+        return best_dist, best
+
+    def rebuild(self) -> None:
+        tiles = self.hex_map.tiles
+        self.costs = {coord: self.tile_cost(coord) for coord in tiles}
+        self.distances = {coord: math.inf for coord in tiles}
+        self.next_hops = {coord: None for coord in tiles}
+        self.center_coords = {tile.center: coord for coord, tile in tiles.items()}
+        base = self.hex_map.base_coord
+        if base in tiles:
+            self.distances[base] = 0.0
+            self.propagate([base])
+        self.version += 1
+
+    def propagate(self, sources: List[Tuple[int, int]]) -> None:
+        heap = [(self.distances[coord], coord) for coord in sources]
+        heapq.heapify(heap)
+        while heap:
+            dist, coord = heapq.heappop(heap)
+            if dist > self.distances[coord]:
+                continue
+            for neighbor in self.neighbors(coord):
+                candidate = dist + self.costs[neighbor]
+                if candidate < self.distances[neighbor]:
+                    self.distances[neighbor] = candidate
+                    self.next_hops[neighbor] = coord
+                    heapq.heappush(heap, (candidate, neighbor))
+
+    def upstream(self, coord: Tuple[int, int]) -> List[Tuple[int, int]]:
+        children: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for child, parent in self.next_hops.items():
+            if parent is not None:
+                children.setdefault(parent, []).append(child)
+        affected = [coord]
+        for current in affected:
+            affected.extend(children.get(current, ()))
+        return affected
+
+    def update_tile(self, coord: Tuple[int, int]) -> None:
+        if coord not in self.costs or coord == self.hex_map.base_coord:
+            return
+        old_cost = self.costs[coord]
+        new_cost = self.tile_cost(coord)
+        if new_cost == old_cost:
+            return
+        self.costs[coord] = new_cost
+        if new_cost < old_cost:
+            best_dist, best = self.best_neighbor(coord)
+            if best is not None and best_dist + new_cost < self.distances[coord]:
+                self.distances[coord] = best_dist + new_cost
+                self.next_hops[coord] = best
+                self.propagate([coord])
+        else:
+            affected = self.upstream(coord)
+            for tile_coord in affected:
+                self.distances[tile_coord] = math.inf
+                self.next_hops[tile_coord] = None
+            for tile_coord in affected:
+                best_dist, best = self.best_neighbor(tile_coord)
+                if best is not None:
+                    self.distances[tile_coord] = best_dist + self.costs[tile_coord]
+                    self.next_hops[tile_coord] = best
+            self.propagate(affected)
+        self.version += 1
+
+    def next_center(self, center: Tuple[float, float]) -> Optional[Tuple[float, float]]:
+        next_hop = self.next_hops.get(self.center_coords.get(center))
+        if next_hop is None:
+            return None
+        return self.hex_map.tiles[next_hop].center
+
+
 class HexMap:
     def __init__(
         self,
@@ -68,6 +203,9 @@ class HexMap:
         self.base_coord = base_coord
         self.tiles: Dict[Tuple[int, int], Tile] = {}
         self.border_coords: List[Tuple[int, int]] = []
+        self.border_paths: Dict[Tuple[int, int], Tuple[Tuple[float, float], ...]] = {}
+        self.layer: Optional[pygame.Surface] = None
+        self.dirty_tiles: Set[Tuple[int, int]] = set()
         self.generate_hex_grid()
 
     def axial_to_pixel(self, coord: Tuple[int, int]) -> Tuple[float, float]:
@@ -97,6 +235,7 @@ class HexMap:
 
     def generate_hex_grid(self) -> None:
         self.tiles.clear()
+        self.layer = None
         for q in range(-self.radius, self.radius + 1):
             for r in range(-self.radius, self.radius + 1):
                 s = -q - r
@@ -111,6 +250,8 @@ class HexMap:
             for coord in self.tiles
             if self.hex_distance(coord, (0, 0)) == self.radius
         ]
+        self.border_paths = {coord: self.build_path(coord) for coord in self.border_coords}
+        self.flow_field = FlowField(self)
 
     @staticmethod
     def axial_to_cube(coord: Tuple[int, int]) -> Tuple[int, int, int]:
@@ -143,20 +284,242 @@ class HexMap:
             results.append(self.cube_to_axial(self.cube_round(x, y, z)))
         return results
 
-    def path_from_border_to_base(self) -> List[Tuple[float, float]]:
+    def build_path(self, start: Tuple[int, int]) -> Tuple[Tuple[float, float], ...]:
+        if self.base_coord not in self.tiles:
+            return ()
+        coords = self.axial_line(start, self.base_coord)
+        return tuple(self.tiles[coord].center for coord in coords if coord in self.tiles)
+
+    def path_from_border_to_base(self) -> Tuple[Tuple[float, float], ...]:
         if not self.border_coords or self.base_coord not in self.tiles:
-            return []
+            return ()
         start = random.choice(self.border_coords)
-        coords = self.axial_line(start, self.base_coord)
-        return [self.tiles[coord].center for coord in coords if coord in self.tiles]
+        return self.border_paths[start]
 
     def get_tile_at_pixel(self, x: float, y: float) -> Optional[Tile]:
         coord = self.pixel_to_axial(x, y)
         return self.tiles.get(coord)
 
-    def draw(self, surface: pygame.Surface, highlight_tile: Optional[Tile]) -> None:
+    def invalidate_tile(self, coord: Tuple[int, int]) -> None:
+        if coord in self.tiles:
+            self.dirty_tiles.add(coord)
+
+    def render_layer(self, size: Tuple[int, int]) -> None:
+        self.layer = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            self.layer = self.layer.convert()
+        self.layer.fill(BACKGROUND_COLOR)
         for tile in self.tiles.values():
-            tile.draw(surface, self.hex_size - 1, tile is highlight_tile)
+            tile.draw(self.layer, self.hex_size - 1)
+        self.dirty_tiles.clear()
+
+    def draw(self, surface: pygame.Surface, highlight_tile: Optional[Tile]) -> None:
+        if self.layer is None or self.layer.get_size() != surface.get_size():
+            self.render_layer(surface.get_size())
+        elif self.dirty_tiles:
+            for coord in self.dirty_tiles:
+                self.tiles[coord].draw(self.layer, self.hex_size - 1)
+            self.dirty_tiles.clear()
+        surface.blit(self.layer, (0, 0))
+        if highlight_tile is not None:
+            pygame.draw.polygon(surface, (255, 255, 255), highlight_tile.polygon(self.hex_size - 1), 2)
+
+
+class SpatialGrid:
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Dict[pygame.sprite.Sprite, None]] = {}
+        self.locations: Dict[pygame.sprite.Sprite, Tuple[int, int]] = {}
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.locations.clear()
+
+    def rebuild(self, sprites: pygame.sprite.Group) -> None:
+        self.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def insert(self, sprite: pygame.sprite.Sprite) -> None:
+        cell = self.cell_of(*sprite.rect.center)
+        self.cells.setdefault(cell, {})[sprite] = None
+        self.locations[sprite] = cell
+
+    def remove(self, sprite: pygame.sprite.Sprite) -> None:
+        cell = self.locations.pop(sprite, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        del bucket[sprite]
+        if not bucket:
+            del self.cells[cell]
+
+    def move(self, sprite: pygame.sprite.Sprite) -> None:
+        cell = self.cell_of(*sprite.rect.center)
+        if self.locations.get(sprite) == cell:
+            return
+        self.remove(sprite)
+        self.insert(sprite)
+
+    def query(self, center: Tuple[float, float], radius: float) -> List[Tuple[float, pygame.sprite.Sprite]]:
+        cx, cy = center
+        min_x, min_y = self.cell_of(cx - radius, cy - radius)
+        max_x, max_y = self.cell_of(cx + radius, cy + radius)
+        results = []
+        for gx in range(min_x, max_x + 1):
+            for gy in range(min_y, max_y + 1):
+                bucket = self.cells.get((gx, gy))
+                if not bucket:
+                    continue
+                for sprite in bucket:
+                    sx, sy = sprite.rect.center
+                    dist = math.hypot(sx - cx, sy - cy)
+                    if dist <= radius:
+                        results.append((dist, sprite))
+        return results
+
+
+class SlowField:
+    def __init__(self, towers: pygame.sprite.Group, cell_size: float = SLOW_FIELD_CELL_SIZE):
+        self.towers = towers
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Tuple[float, Tuple[Tuple[int, int, float, float], ...]]] = {}
+
+    def invalidate(self) -> None:
+        self.cells.clear()
+
+    def build_cell(self, cell: Tuple[int, int]) -> Tuple[float, Tuple[Tuple[int, int, float, float], ...]]:
+        left = cell[0] * self.cell_size
+        top = cell[1] * self.cell_size
+        right = left + self.cell_size
+        bottom = top + self.cell_size
+        covered = 1.0
+        partial = []
+        for tower in self.towers:
+            if not tower.is_wall:
+                continue
+            cx, cy = tower.rect.center
+            radius = tower.slow_radius
+            near_x = min(max(cx, left), right) - cx
+            near_y = min(max(cy, top), bottom) - cy
+            far_x = max(abs(cx - left), abs(cx - right))
+            far_y = max(abs(cy - top), abs(cy - bottom))
+            if math.sqrt(far_x * far_x + far_y * far_y) < radius - 1e-6:
+                covered = min(covered, tower.tower_type.slow_factor)
+            elif math.sqrt(near_x * near_x + near_y * near_y) <= radius + 1e-6:
+                partial.append((cx, cy, radius, tower.tower_type.slow_factor))
+        partial = [entry for entry in partial if entry[3] < covered]
+        return covered, tuple(partial)
+
+    def modifier(self, x: float, y: float) -> float:
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        entry = self.cells.get(cell)
+        if entry is None:
+            entry = self.cells[cell] = self.build_cell(cell)
+        modifier, partial = entry
+        for cx, cy, radius, factor in partial:
+            dx = x - cx
+            dy = y - cy
+            if factor < modifier and math.sqrt(dx * dx + dy * dy) <= radius:
+                modifier = factor
+        return max(0.1, modifier)
+
+
+class CompactSprite(pygame.sprite.Sprite):
+    __slots__ = ("sprite_groups",)
+
+    def __init__(self) -> None:
+        self.sprite_groups: Tuple[pygame.sprite.AbstractGroup, ...] = ()
+
+    def add(self, *groups: pygame.sprite.AbstractGroup) -> None:
+        for group in groups:
+            group.add(self)
+
+    def remove(self, *groups: pygame.sprite.AbstractGroup) -> None:
+        for group in groups:
+            group.remove(self)
+
+    def add_internal(self, group: pygame.sprite.AbstractGroup) -> None:
+        self.sprite_groups += (group,)
+
+    def remove_internal(self, group: pygame.sprite.AbstractGroup) -> None:
+        self.sprite_groups = tuple(member for member in self.sprite_groups if member is not group)
+
+    def kill(self) -> None:
+        for group in self.sprite_groups:
+            group.remove_internal(self)
+        self.sprite_groups = ()
+
+    def groups(self) -> List[pygame.sprite.AbstractGroup]:
+        return list(self.sprite_groups)
+
+    def alive(self) -> bool:
+        return bool(self.sprite_groups)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} Sprite(in {len(self.sprite_groups)} groups)>"
+
+
+class SpritePool:
+    def __init__(self, factory: Callable[..., pygame.sprite.Sprite]):
+        self.factory = factory
+        self.free: List[pygame.sprite.Sprite] = []
+
+    def acquire(self, *args, **kwargs) -> pygame.sprite.Sprite:
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args, **kwargs)
+            return sprite
+        return self.factory(*args, **kwargs)
+
+    def release(self, sprite: pygame.sprite.Sprite) -> None:
+        self.free.append(sprite)
+
+
+class SpriteAtlas:
+    def __init__(self) -> None:
+        self.images: Dict[object, pygame.Surface] = {}
+
+    def circle(self, key: object, size: int, color: Color, radius: int) -> pygame.Surface:
+        image = self.images.get(key)
+        if image is None:
+            image = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(image, color, (size // 2, size // 2), radius)
+            self.images[key] = image
+        return image
+
+    def tower(self, tower_type: "TowerType") -> pygame.Surface:
+        return self.circle(("tower", tower_type.name, tower_type.color), 50, tower_type.color, 24)
+
+    def enemy(self, enemy_type: "EnemyType") -> pygame.Surface:
+        radius = enemy_type.radius
+        return self.circle(("enemy", enemy_type.name, enemy_type.color, radius), radius * 2, enemy_type.color, radius)
+
+    def projectile(self) -> pygame.Surface:
+        return self.circle("projectile", 10, (240, 240, 120), 5)
+
+    def health_bar(self, width: int, filled: int, back: Color, front: Color) -> pygame.Surface:
+        key = ("health", width, filled, back, front)
+        image = self.images.get(key)
+        if image is None:
+            image = pygame.Surface((width, 4))
+            image.fill(back)
+            image.fill(front, pygame.Rect(0, 0, filled, 4))
+            self.images[key] = image
+        return image
+
+    def preload(self, tower_types: Dict[str, "TowerType"], enemy_types: Dict[str, "EnemyType"]) -> None:
+        for tower_type in tower_types.values():
+            self.tower(tower_type)
+        for enemy_type in enemy_types.values():
+            self.enemy(enemy_type)
+        self.projectile()
+
+
+SPRITE_ATLAS = SpriteAtlas()
 
 
 @dataclass(frozen=True)
@@ -175,45 +538,85 @@ class EnemyType:
     ranged_cooldown: float
 
 
-class Enemy(pygame.sprite.Sprite):
+class Enemy(CompactSprite):
+    __slots__ = (
+        "generation",
+        "path",
+        "current_index",
+        "target",
+        "enemy_type",
+        "base_speed",
+        "max_hp",
+        "hp",
+        "reward",
+        "image",
+        "rect",
+        "pos",
+        "game",
+        "melee_timer",
+        "ranged_timer",
+    )
+
     def __init__(
         self,
-        path: List[Tuple[float, float]],
+        path: Sequence[Tuple[float, float]],
         enemy_type: EnemyType,
         hp_multiplier: float = 1.0,
         speed_multiplier: float = 1.0,
         reward_multiplier: float = 1.0,
     ):
         super().__init__()
+        self.generation = 0
+        self.reset(path, enemy_type, hp_multiplier, speed_multiplier, reward_multiplier)
+
+    def reset(
+        self,
+        path: Sequence[Tuple[float, float]],
+        enemy_type: EnemyType,
+        hp_multiplier: float = 1.0,
+        speed_multiplier: float = 1.0,
+        reward_multiplier: float = 1.0,
+    ) -> None:
+        self.generation += 1
         self.path = path
         self.current_index = 0
+        self.target: Optional[Tuple[float, float]] = path[0] if path else None
         self.enemy_type = enemy_type
         self.base_speed = enemy_type.speed * speed_multiplier
         self.max_hp = math.ceil(enemy_type.hp * hp_multiplier)
         self.hp = self.max_hp
         self.reward = math.ceil(enemy_type.reward * reward_multiplier)
-        diameter = enemy_type.radius * 2
-        self.image = pygame.Surface((diameter, diameter), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, enemy_type.color, (enemy_type.radius, enemy_type.radius), enemy_type.radius)
+        self.image = SPRITE_ATLAS.enemy(enemy_type)
         self.rect = self.image.get_rect(center=self.path[0])
         self.pos = pygame.Vector2(self.rect.center)
         self.game: Optional["Game"] = None
         self.melee_timer = 0.0
         self.ranged_timer = 0.0
 
+    def next_waypoint(self, game: "Game") -> Optional[Tuple[float, float]]:
+        if game.flow_field is not None:
+            return game.flow_field.next_center(self.target)
+        if self.current_index < len(self.path):
+            return self.path[self.current_index]
+        return None
+
+    def advance(self, game: "Game") -> None:
+        self.current_index += 1
+        self.target = self.next_waypoint(game)
+
     def update(self, dt: float, game: "Game") -> None:
-        if self.current_index >= len(self.path):
+        if self.target is None:
             game.lives -= 1
             self.kill()
             return
         self.melee_timer += dt
         self.ranged_timer += dt
-        target = pygame.Vector2(self.path[self.current_index])
+        target = pygame.Vector2(self.target)
         direction = target - self.pos
         distance = direction.length()
         if distance < 1:
-            self.current_index += 1
-            if self.current_index >= len(self.path):
+            self.advance(game)
+            if self.target is None:
                 game.lives -= 1
                 self.kill()
             return
@@ -222,34 +625,53 @@ class Enemy(pygame.sprite.Sprite):
         effective_speed = self.base_speed * game.get_speed_modifier(self.pos)
         self.pos += direction * effective_speed * dt
         self.rect.center = self.pos
+        game.enemy_grid.move(self)
         self.try_attack_towers(game)
 
     def take_damage(self, amount: float, game: "Game") -> None:
         self.hp -= amount
         if self.hp <= 0:
             game.money += self.reward
+            game.kills += 1
             self.kill()
 
-    def draw_health(self, surface: pygame.Surface) -> None:
-        bar_w = self.rect.width
-        ratio = max(self.hp, 0) / self.max_hp
-        bar_rect = pygame.Rect(0, 0, bar_w, 4)
+    def kill(self) -> None:
+        if self.game is not None:
+            self.game.enemy_grid.remove(self)
+            if self.alive():
+                self.game.enemy_pool.release(self)
+        super().kill()
+
+    def health_bar_rect(self) -> pygame.Rect:
+        bar_rect = pygame.Rect(0, 0, self.rect.width, 4)
         bar_rect.midbottom = (self.rect.centerx, self.rect.top - 4)
-        pygame.draw.rect(surface, (50, 50, 50), bar_rect)
-        inner = bar_rect.copy()
-        inner.width = int(bar_w * ratio)
-        pygame.draw.rect(surface, (50, 200, 50), inner)
+        return bar_rect
 
-    def try_attack_towers(self, game: "Game") -> None:
-        if not game.towers:
-            return
+    def health_bar_width(self) -> int:
+        return int(self.rect.width * (max(self.hp, 0) / self.max_hp))
+
+    def health_bar_image(self) -> pygame.Surface:
+        return SPRITE_ATLAS.health_bar(self.rect.width, self.health_bar_width(), (50, 50, 50), (50, 200, 50))
+
+    def path_progress(self) -> Tuple[int, float]:
+        if self.target is None:
+            return self.current_index, 0.0
+        return self.current_index, -math.hypot(self.target[0] - self.pos.x, self.target[1] - self.pos.y)
+
+    def closest_tower(self, game: "Game") -> Tuple[Optional["Tower"], float]:
         closest = None
         closest_dist = float("inf")
-        for tower in game.towers:
-            dist = pygame.Vector2(tower.rect.center).distance_to(self.rect.center)
-            if dist < closest_dist:
+        reach = max(self.enemy_type.melee_range, self.enemy_type.ranged_range)
+        for dist, tower in game.tower_grid.query(self.rect.center, reach):
+            if dist < closest_dist and tower.alive():
                 closest = tower
                 closest_dist = dist
+        return closest, closest_dist
+
+    def try_attack_towers(self, game: "Game") -> None:
+        if not game.towers:
+            return
+        closest, closest_dist = self.closest_tower(game)
         if closest is None:
             return
         if (
@@ -266,32 +688,102 @@ class Enemy(pygame.sprite.Sprite):
             self.ranged_timer = 0.0
 
 
-class Projectile(pygame.sprite.Sprite):
-    def __init__(self, pos: Tuple[float, float], target: Enemy, damage: float, speed: float, game: "Game"):
+class Projectile(CompactSprite):
+    __slots__ = (
+        "target",
+        "target_generation",
+        "hit_radius",
+        "damage",
+        "speed",
+        "splash_radius",
+        "chain_count",
+        "chain_range",
+        "game",
+        "image",
+        "rect",
+        "pos",
+    )
+
+    def __init__(
+        self,
+        pos: Tuple[float, float],
+        target: Enemy,
+        damage: float,
+        speed: float,
+        game: "Game",
+        splash_radius: float = 0.0,
+        chain_count: int = 0,
+        chain_range: float = 0.0,
+    ):
         super().__init__()
+        self.reset(pos, target, damage, speed, game, splash_radius, chain_count, chain_range)
+
+    def reset(
+        self,
+        pos: Tuple[float, float],
+        target: Enemy,
+        damage: float,
+        speed: float,
+        game: "Game",
+        splash_radius: float = 0.0,
+        chain_count: int = 0,
+        chain_range: float = 0.0,
+    ) -> None:
         self.target = target
+        self.target_generation = target.generation
+        self.hit_radius = target.enemy_type.radius
         self.damage = damage
         self.speed = speed
+        self.splash_radius = splash_radius
+        self.chain_count = chain_count
+        self.chain_range = chain_range
         self.game = game
-        self.image = pygame.Surface((10, 10), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, (240, 240, 120), (5, 5), 5)
+        self.image = SPRITE_ATLAS.projectile()
         self.rect = self.image.get_rect(center=pos)
         self.pos = pygame.Vector2(pos)
 
     def update(self, dt: float) -> None:
-        if not self.target.alive():
+        if not self.target.alive() or self.target.generation != self.target_generation:
             self.kill()
             return
-        direction = pygame.Vector2(self.target.rect.center) - self.pos
-        distance = direction.length()
-        if distance <= self.speed * dt or distance == 0:
-            self.target.take_damage(self.damage, self.game)
+        target_x, target_y = self.target.rect.center
+        dx = target_x - self.pos.x
+        dy = target_y - self.pos.y
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance <= self.speed * dt + self.hit_radius:
+            for enemy, amount in self.impacts(self.game.enemy_grid):
+                enemy.take_damage(amount, self.game)
             self.kill()
             return
-        direction = direction.normalize()
-        self.pos += direction * self.speed * dt
+        self.pos.x += dx / distance * self.speed * dt
+        self.pos.y += dy / distance * self.speed * dt
         self.rect.center = self.pos
 
+    def impacts(self, enemies: SpatialGrid) -> List[Tuple[Enemy, float]]:
+        if self.splash_radius > 0:
+            hits = [(enemy, self.damage) for _, enemy in enemies.query(self.target.rect.center, self.splash_radius)]
+        else:
+            hits = [(self.target, self.damage)]
+        struck = {enemy for enemy, _ in hits}
+        source = self.target
+        damage = self.damage
+        for _ in range(self.chain_count):
+            candidates = [
+                (dist, enemy) for dist, enemy in enemies.query(source.rect.center, self.chain_range) if enemy not in struck
+            ]
+            if not candidates:
+                break
+            source = min(candidates, key=lambda item: item[0])[1]
+            damage *= CHAIN_FALLOFF
+            struck.add(source)
+            hits.append((source, damage))
+        return hits
+
+    def kill(self) -> None:
+        if self.alive():
+            self.game.projectile_pool.release(self)
+        super().kill()
+
 
 @dataclass(frozen=True)
 class TowerType:
@@ -305,6 +797,10 @@ class TowerType:
     is_wall: bool = False
     slow_factor: float = 1.0
     slow_radius: float = 0.0
+    splash_radius: float = 0.0
+    chain_count: int = 0
+    chain_range: float = 0.0
+    targeting: str = "closest"
     max_hp: int = 160
 
 
@@ -317,14 +813,17 @@ class Tower(pygame.sprite.Sprite):
         self.fire_rate = tower_type.fire_rate
         self.damage = tower_type.damage
         self.projectile_speed = tower_type.projectile_speed
+        self.slow_radius = tower_type.slow_radius
+        self.targeting = tower_type.targeting
         self.time_since_last_shot = 0.0
+        self.levels = tower_levels(tower_type)
         self.level = 1
-        self.max_level = 5
+        self.max_level = len(self.levels)
         self.is_wall = tower_type.is_wall
         self.max_hp = tower_type.max_hp if not self.is_wall else tower_type.max_hp + 60
         self.hp = self.max_hp
-        self.image = pygame.Surface((50, 50), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, tower_type.color, (25, 25), 24)
+        self.game: Optional["Game"] = None
+        self.image = SPRITE_ATLAS.tower(tower_type)
         self.rect = self.image.get_rect(center=tile.center)
 
     def update(self, dt: float, game: "Game") -> None:
@@ -333,37 +832,64 @@ class Tower(pygame.sprite.Sprite):
         self.time_since_last_shot += dt
         if self.time_since_last_shot < self.fire_rate:
             return
-        target = self.find_target(game.enemies)
+        target = self.find_target(game.enemy_grid)
         if target is None:
             return
-        projectile = Projectile(self.rect.center, target, self.damage, self.projectile_speed, game)
-        game.projectiles.add(projectile)
+        self.launch(target, game)
         self.time_since_last_shot = 0.0
 
-    def find_target(self, enemies: pygame.sprite.Group) -> Optional[Enemy]:
+    def launch(self, target: Enemy, game: "Game") -> Projectile:
+        tower_type = self.tower_type
+        projectile = game.projectile_pool.acquire(
+            self.rect.center,
+            target,
+            self.damage,
+            self.projectile_speed,
+            game,
+            tower_type.splash_radius,
+            tower_type.chain_count,
+            tower_type.chain_range,
+        )
+        game.projectiles.add(projectile)
+        return projectile
+
+    def find_target(self, enemies: SpatialGrid) -> Optional[Enemy]:
+        if self.targeting != "closest":
+            return self.find_priority_target(enemies)
         closest = None
         closest_dist = float("inf")
-        for enemy in enemies:
-            dist = pygame.Vector2(enemy.rect.center).distance_to(self.rect.center)
-            if dist <= self.range and dist < closest_dist:
+        for dist, enemy in enemies.query(self.rect.center, self.range):
+            if dist < closest_dist:
                 closest = enemy
                 closest_dist = dist
         return closest
 
+    def find_priority_target(self, enemies: SpatialGrid) -> Optional[Enemy]:
+        priority = TARGET_PRIORITIES[self.targeting]
+        best = None
+        best_key = None
+        for dist, enemy in enemies.query(self.rect.center, self.range):
+            key = (priority(enemy), -dist)
+            if best_key is None or key > best_key:
+                best = enemy
+                best_key = key
+        return best
+
+    def cycle_targeting(self) -> None:
+        self.targeting = TARGETING_MODES[(TARGETING_MODES.index(self.targeting) + 1) % len(TARGETING_MODES)]
+
     def upgrade_cost(self) -> int:
-        return int(self.tower_type.cost * (0.7 + 0.4 * self.level))
+        return self.levels[self.level - 1].upgrade_cost
 
     def upgrade(self) -> None:
         if self.level >= self.max_level:
             return
         self.level += 1
-        if self.is_wall:
-            updated_fields = {**vars(self.tower_type), "slow_radius": self.tower_type.slow_radius + 8}
-            self.tower_type = TowerType(**updated_fields)
-        else:
-            self.range *= 1.12
-            self.damage *= 1.18
-            self.fire_rate = max(0.2, self.fire_rate * 0.92)
+        stats = self.levels[self.level - 1]
+        self.range = stats.range
+        self.damage = stats.damage
+        self.fire_rate = stats.fire_rate
+        self.slow_radius = stats.slow_radius
 
     def take_damage(self, amount: float) -> None:
         self.hp -= amount
@@ -376,112 +902,234 @@ class Tower(pygame.sprite.Sprite):
     def destroy(self) -> None:
         if self.tile.tower is self:
             self.tile.tower = None
+            if self.game is not None:
+                self.game.tower_changed(self)
         self.kill()
 
-    def draw_health(self, surface: pygame.Surface) -> None:
-        bar_w = self.rect.width
-        ratio = max(self.hp, 0) / self.max_hp
-        bar_rect = pygame.Rect(0, 0, bar_w, 4)
+    def health_bar_rect(self) -> pygame.Rect:
+        bar_rect = pygame.Rect(0, 0, self.rect.width, 4)
         bar_rect.midtop = (self.rect.centerx, self.rect.bottom + 6)
-        pygame.draw.rect(surface, (40, 40, 40), bar_rect)
-        inner = bar_rect.copy()
-        inner.width = int(bar_w * ratio)
-        pygame.draw.rect(surface, (80, 200, 80), inner)
-
-
-TOWER_TYPES: Dict[str, TowerType] = {
-    "basic": TowerType(
-        name="Basic",
-        cost=50,
-        range=170,
-        fire_rate=0.9,
-        damage=20,
-        projectile_speed=320,
-        color=(100, 160, 220),
-        max_hp=160,
-    ),
-    "sniper": TowerType(
-        name="Sniper",
-        cost=85,
-        range=280,
-        fire_rate=1.8,
-        damage=40,
-        projectile_speed=420,
-        color=(220, 200, 120),
-        max_hp=140,
-    ),
-    "rapid": TowerType(
-        name="Rapid",
-        cost=70,
-        range=140,
-        fire_rate=0.45,
-        damage=12,
-        projectile_speed=360,
-        color=(150, 220, 140),
-        max_hp=150,
-    ),
-    "wall": TowerType(
-        name="Wall",
-        cost=40,
-        range=0,
-        fire_rate=0,
-        damage=0,
-        projectile_speed=0,
-        color=(90, 90, 110),
-        is_wall=True,
-        slow_factor=0.35,
-        slow_radius=65,
-        max_hp=200,
-    ),
-}
+        return bar_rect
+
+    def health_bar_width(self) -> int:
+        return int(self.rect.width * (max(self.hp, 0) / self.max_hp))
 
+    def health_bar_image(self) -> pygame.Surface:
+        return SPRITE_ATLAS.health_bar(self.rect.width, self.health_bar_width(), (40, 40, 40), (80, 200, 80))
 
-ENEMY_TYPES: Dict[str, EnemyType] = {
-    "grunt": EnemyType(
-        "Grunt",
-        speed=60,
-        hp=60,
-        reward=18,
-        color=(220, 80, 80),
-        radius=14,
-        melee_damage=8,
-        melee_range=26,
-        melee_cooldown=1.1,
-        ranged_damage=5,
-        ranged_range=140,
-        ranged_cooldown=2.4,
-    ),
-    "swift": EnemyType(
-        "Swift",
-        speed=95,
-        hp=45,
-        reward=15,
-        color=(120, 200, 140),
-        radius=13,
-        melee_damage=6,
-        melee_range=26,
-        melee_cooldown=0.8,
-        ranged_damage=4,
-        ranged_range=120,
-        ranged_cooldown=1.8,
-    ),
-    "tank": EnemyType(
-        "Tank",
-        speed=40,
-        hp=130,
-        reward=35,
-        color=(170, 140, 220),
-        radius=16,
-        melee_damage=14,
-        melee_range=32,
-        melee_cooldown=1.3,
-        ranged_damage=9,
-        ranged_range=170,
-        ranged_cooldown=2.8,
-    ),
+
+TARGET_PRIORITIES: Dict[str, Callable[[Enemy], object]] = {
+    "first": Enemy.path_progress,
+    "strongest": lambda enemy: enemy.hp,
+    "weakest": lambda enemy: -enemy.hp,
+    "fastest": lambda enemy: enemy.base_speed,
 }
 
 
+@dataclass(frozen=True)
+class UpgradeRule:
+    max_level: int
+    range_scale: float
+    damage_scale: float
+    fire_rate_scale: float
+    min_fire_rate: float
+    slow_radius_step: float
+    cost_base: float
+    cost_per_level: float
+
+
+@dataclass(frozen=True)
+class TowerLevel:
+    range: float
+    damage: float
+    fire_rate: float
+    slow_radius: float
+    upgrade_cost: int
+
+
+@dataclass(frozen=True)
+class WaveScaling:
+    hp_base: float
+    hp_per_wave: float
+    reward_base: float
+    reward_per_wave: float
+
+
+@dataclass(frozen=True)
+class WaveRule:
+    enemy_type: str
+    count_base: int
+    count_divisor: int
+    interval_base: float
+    every: int = 1
+    count_min: int = 0
+    interval_per_wave: float = 0.0
+    interval_min: float = 0.0
+    speed_base: float = 1.0
+    speed_per_wave: float = 0.0
+    hp_scale: float = 1.0
+    reward_scale: float = 1.0
+
+
+@dataclass
+class GameData:
+    map_radius: int
+    hex_size: int
+    tower_types: Dict[str, TowerType]
+    enemy_types: Dict[str, EnemyType]
+    upgrade_rule: UpgradeRule
+    wave_scaling: WaveScaling
+    wave_rules: Tuple[WaveRule, ...]
+
+
+def check_value(where: str, value: object, kind: object) -> object:
+    if kind == Color:
+        if not (
+            isinstance(value, (list, tuple))
+            and len(value) == 3
+            and all(isinstance(c, int) and not isinstance(c, bool) and 0 <= c <= 255 for c in value)
+        ):
+            raise ValueError(f"{where}: expected an [r, g, b] colour")
+        return tuple(value)
+    if kind is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+    elif kind is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    else:
+        valid = isinstance(value, kind)
+    if not valid:
+        raise ValueError(f"{where}: expected {kind.__name__}, got {value!r}")
+    return value
+
+
+def check_record(where: str, raw: object, cls: type) -> Dict[str, object]:
+    if not isinstance(raw, dict):
+        raise ValueError(f"{where}: expected an object")
+    known = {field.name: field for field in fields(cls)}
+    unknown = [key for key in raw if key not in known]
+    if unknown:
+        raise ValueError(f"{where}: unknown field {unknown[0]!r}")
+    hints = get_type_hints(cls)
+    record = {}
+    for name, field in known.items():
+        if name in raw:
+            record[name] = check_value(f"{where}.{name}", raw[name], hints[name])
+        elif field.default is MISSING:
+            raise ValueError(f"{where}: missing field {name!r}")
+    return record
+
+
+def check_table(where: str, raw: object, cls: type) -> Dict[str, Dict[str, object]]:
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError(f"{where}: expected a non-empty object")
+    return {key: check_record(f"{where}.{key}", entry, cls) for key, entry in raw.items()}
+
+
+def validate_game_data(raw: object) -> Dict[str, object]:
+    if not isinstance(raw, dict):
+        raise ValueError("game data: expected an object")
+    sections = ("map_radius", "hex_size", "towers", "enemies", "upgrades", "wave_scaling", "wave_groups")
+    for key in raw:
+        if key not in sections:
+            raise ValueError(f"game data: unknown section {key!r}")
+    for key in sections:
+        if key not in raw:
+            raise ValueError(f"game data: missing section {key!r}")
+    data = {
+        "map_radius": check_value("map_radius", raw["map_radius"], int),
+        "hex_size": check_value("hex_size", raw["hex_size"], int),
+        "towers": check_table("towers", raw["towers"], TowerType),
+        "enemies": check_table("enemies", raw["enemies"], EnemyType),
+        "upgrades": check_record("upgrades", raw["upgrades"], UpgradeRule),
+        "wave_scaling": check_record("wave_scaling", raw["wave_scaling"], WaveScaling),
+    }
+    if data["map_radius"] < 1 or data["hex_size"] < 1:
+        raise ValueError("game data: map_radius and hex_size must be positive")
+    if data["upgrades"]["max_level"] < 1:
+        raise ValueError("upgrades.max_level: must be at least 1")
+    for key, tower in data["towers"].items():
+        if tower.get("targeting", "closest") not in TARGETING_MODES:
+            raise ValueError(f"towers.{key}.targeting: expected one of {', '.join(TARGETING_MODES)}")
+    if not isinstance(raw["wave_groups"], list) or not raw["wave_groups"]:
+        raise ValueError("wave_groups: expected a non-empty list")
+    groups = []
+    for i, entry in enumerate(raw["wave_groups"]):
+        group = check_record(f"wave_groups[{i}]", entry, WaveRule)
+        if group["enemy_type"] not in data["enemies"]:
+            raise ValueError(f"wave_groups[{i}].enemy_type: unknown enemy {group['enemy_type']!r}")
+        if group.get("every", 1) < 1 or group["count_divisor"] < 1:
+            raise ValueError(f"wave_groups[{i}]: every and count_divisor must be at least 1")
+        groups.append(group)
+    data["wave_groups"] = groups
+    return data
+
+
+def build_game_data(data: Dict) -> GameData:
+    return GameData(
+        map_radius=data["map_radius"],
+        hex_size=data["hex_size"],
+        tower_types={key: TowerType(**entry) for key, entry in data["towers"].items()},
+        enemy_types={key: EnemyType(**entry) for key, entry in data["enemies"].items()},
+        upgrade_rule=UpgradeRule(**data["upgrades"]),
+        wave_scaling=WaveScaling(**data["wave_scaling"]),
+        wave_rules=tuple(WaveRule(**group) for group in data["wave_groups"]),
+    )
+
+
+def load_game_data(path: Path = GAME_DATA_PATH, cache_path: Optional[Path] = None) -> GameData:
+    cache_path = cache_path or path.with_suffix(".cache")
+    stat = path.stat()
+    try:
+        blob = cache_path.read_bytes()
+        magic, version, mtime, size = GAME_DATA_CACHE_HEADER.unpack_from(blob)
+        if (magic, version, mtime, size) == (GAME_DATA_CACHE_MAGIC, GAME_DATA_CACHE_VERSION, stat.st_mtime_ns, stat.st_size):
+            return build_game_data(marshal.loads(blob[GAME_DATA_CACHE_HEADER.size :]))
+    except (OSError, struct.error, EOFError, ValueError, TypeError):
+        pass
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"{path.name}: {exc}") from None
+    data = validate_game_data(raw)
+    header = GAME_DATA_CACHE_HEADER.pack(GAME_DATA_CACHE_MAGIC, GAME_DATA_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    try:
+        cache_path.write_bytes(header + marshal.dumps(data))
+    except OSError:
+        pass
+    return build_game_data(data)
+
+
+GAME_DATA = load_game_data()
+MAP_RADIUS = GAME_DATA.map_radius
+HEX_SIZE = GAME_DATA.hex_size
+GRID_CELL_SIZE = HEX_SIZE * 2
+TOWER_TYPES = GAME_DATA.tower_types
+ENEMY_TYPES = GAME_DATA.enemy_types
+
+
+@lru_cache(maxsize=None)
+def tower_levels(tower_type: TowerType) -> Tuple[TowerLevel, ...]:
+    rule = GAME_DATA.upgrade_rule
+    range_, damage, fire_rate, slow_radius = (
+        tower_type.range,
+        tower_type.damage,
+        tower_type.fire_rate,
+        tower_type.slow_radius,
+    )
+    levels = []
+    for level in range(1, rule.max_level + 1):
+        if level > 1:
+            if tower_type.is_wall:
+                slow_radius = slow_radius + rule.slow_radius_step
+            else:
+                range_ *= rule.range_scale
+                damage *= rule.damage_scale
+                fire_rate = max(rule.min_fire_rate, fire_rate * rule.fire_rate_scale)
+        upgrade_cost = int(tower_type.cost * (rule.cost_base + rule.cost_per_level * level))
+        levels.append(TowerLevel(range_, damage, fire_rate, slow_radius, upgrade_cost))
+    return tuple(levels)
+
+
 @dataclass
 class WaveEntry:
     enemy_type: str
@@ -497,62 +1145,60 @@ class WaveDefinition:
     entries: List[WaveEntry]
 
 
-def generate_wave_definitions(total_waves: int) -> List[WaveDefinition]:
-    waves: List[WaveDefinition] = []
-    for idx in range(total_waves):
-        wave_number = idx + 1
-        base_count = 8 + wave_number // 2
-        burst_count = 4 + wave_number // 4
-        hp_scale = 1.0 + wave_number * 0.05
-        reward_scale = 1.0 + wave_number * 0.02
-        grunt_interval = max(0.22, 1.05 - wave_number * 0.008)
-        entries: List[WaveEntry] = [
+def wave_definition(wave_number: int) -> WaveDefinition:
+    scaling = GAME_DATA.wave_scaling
+    hp_scale = scaling.hp_base + wave_number * scaling.hp_per_wave
+    reward_scale = scaling.reward_base + wave_number * scaling.reward_per_wave
+    return WaveDefinition(
+        [
             WaveEntry(
-                "grunt",
-                count=base_count,
-                interval=grunt_interval,
-                hp_multiplier=hp_scale * 0.85,
-                speed_multiplier=1.0 + wave_number * 0.004,
-                reward_multiplier=reward_scale * 0.65,
+                rule.enemy_type,
+                count=max(rule.count_min, rule.count_base + wave_number // rule.count_divisor),
+                interval=max(rule.interval_min, rule.interval_base + wave_number * rule.interval_per_wave),
+                hp_multiplier=hp_scale * rule.hp_scale,
+                speed_multiplier=rule.speed_base + wave_number * rule.speed_per_wave,
+                reward_multiplier=reward_scale * rule.reward_scale,
             )
+            for rule in GAME_DATA.wave_rules
+            if wave_number % rule.every == 0
         ]
-        if wave_number % 3 == 0:
-            entries.append(
-                WaveEntry(
-                    "swift",
-                    count=burst_count,
-                    interval=max(0.18, 0.9 - wave_number * 0.006),
-                    hp_multiplier=hp_scale * 0.7,
-                    speed_multiplier=1.1 + wave_number * 0.006,
-                    reward_multiplier=reward_scale * 0.5,
-                )
-            )
-        if wave_number % 5 == 0:
-            entries.append(
-                WaveEntry(
-                    "tank",
-                    count=max(3, wave_number // 8),
-                    interval=max(0.35, 1.4 - wave_number * 0.0045),
-                    hp_multiplier=hp_scale * 1.4,
-                    speed_multiplier=0.9 + wave_number * 0.0025,
-                    reward_multiplier=reward_scale,
-                )
-            )
-        waves.append(WaveDefinition(entries))
-    return waves
+    )
+
+
+def generate_wave_definitions(total_waves: int) -> List[WaveDefinition]:
+    return [wave_definition(idx + 1) for idx in range(total_waves)]
+
+
+class WaveSource:
+    def __init__(self, total: Optional[int] = None, cache_size: int = WAVE_CACHE_SIZE):
+        self.total = total
+        self.definition = lru_cache(maxsize=cache_size)(wave_definition)
+
+    def __len__(self) -> int:
+        if self.total is None:
+            raise TypeError("an endless wave source has no length")
+        return self.total
+
+    def __getitem__(self, index: int) -> WaveDefinition:
+        if index < 0 or (self.total is not None and index >= self.total):
+            raise IndexError(index)
+        return self.definition(index + 1)
 
 
 class WaveManager:
     def __init__(
         self,
-        waves: List[WaveDefinition],
+        waves: Sequence[WaveDefinition],
         cooldown_duration: float = 3.5,
         base_mob_cap: int = 20,
         mob_cap_growth: int = 2,
         base_spawn_rate_multiplier: float = 2.0,
         spawn_rate_growth: float = 0.05,
+        max_spawns_per_tick: int = MAX_SPAWNS_PER_TICK,
+        auto_start: bool = False,
     ):
         self.waves = waves
+        self.total_waves: Optional[int] = waves.total if isinstance(waves, WaveSource) else len(waves)
         self.current_wave = -1
         self.time_since_last_spawn = 0.0
         self.active = False
@@ -566,11 +1212,13 @@ class WaveManager:
         self.spawn_rate_growth = spawn_rate_growth
         self.current_mob_cap = base_mob_cap
         self.current_spawn_rate_multiplier = base_spawn_rate_multiplier
+        self.max_spawns_per_tick = max_spawns_per_tick
+        self.auto_start = auto_start
 
     def start_next_wave(self) -> None:
         if self.active or self.cooldown_remaining > 0:
             return
-        if self.current_wave + 1 >= len(self.waves):
+        if not self.has_wave(self.current_wave + 1):
             return
         self.current_wave += 1
         self.entry_index = 0
@@ -585,26 +1233,33 @@ class WaveManager:
     def update(self, dt: float, game: "Game") -> None:
         if self.cooldown_remaining > 0 and not self.active:
             self.cooldown_remaining = max(0.0, self.cooldown_remaining - dt)
-        if not self.active or self.current_wave >= len(self.waves):
+            if self.auto_start and self.cooldown_remaining <= 0:
+                self.start_next_wave()
+        if not self.active or not self.has_wave(self.current_wave):
             return
         self.time_since_last_spawn += dt
         wave = self.waves[self.current_wave]
+        budget = self.max_spawns_per_tick
         while self.entry_index < len(wave.entries):
             entry = wave.entries[self.entry_index]
             if self.spawned_in_entry >= entry.count:
                 self.entry_index += 1
                 self.spawned_in_entry = 0
-                self.time_since_last_spawn = 0.0
                 continue
-            if self.time_since_last_spawn >= entry.interval / self.current_spawn_rate_multiplier:
-                self.spawn_enemy(game, entry)
-                self.time_since_last_spawn = 0.0
-            break
+            interval = entry.interval / self.current_spawn_rate_multiplier
+            if budget <= 0 or self.time_since_last_spawn < interval:
+                break
+            self.time_since_last_spawn -= interval
+            budget -= 1
+            self.spawn_enemy(game, entry)
         if self.entry_index >= len(wave.entries) and not game.enemies:
             self.active = False
-            if self.current_wave < len(self.waves) - 1:
+            if self.has_wave(self.current_wave + 1):
                 self.cooldown_remaining = self.cooldown_duration
 
+    def has_wave(self, index: int) -> bool:
+        return self.total_waves is None or index < self.total_waves
+
     def spawn_enemy(self, game: "Game", entry: WaveEntry) -> None:
         if len(game.enemies) >= self.current_mob_cap:
             return
@@ -612,7 +1267,7 @@ class WaveManager:
         if len(path) < 2:
             return
         enemy_type = game.enemy_types[entry.enemy_type]
-        enemy = Enemy(
+        enemy = game.enemy_pool.acquire(
             path,
             enemy_type,
             hp_multiplier=entry.hp_multiplier,
@@ -621,29 +1276,494 @@ class WaveManager:
         )
         enemy.game = game
         game.enemies.add(enemy)
+        game.enemy_grid.insert(enemy)
         self.spawned_in_entry += 1
 
 
+ENEMY_COLUMNS = (
+    "x",
+    "y",
+    "cx",
+    "cy",
+    "tx",
+    "ty",
+    "hp",
+    "speed",
+    "reward",
+    "melee_timer",
+    "ranged_timer",
+    "melee_damage",
+    "melee_range",
+    "melee_cooldown",
+    "ranged_damage",
+    "ranged_range",
+    "ranged_cooldown",
+)
+PROJECTILE_COLUMNS = ("x", "y", "target", "damage", "speed", "radius")
+
+
+class VectorEngine:
+    def __init__(self, game: "Game"):
+        if np is None:
+            raise RuntimeError("The vectorized engine requires NumPy")
+        self.game = game
+        self.enemies: List[Enemy] = []
+        self.enemy_rows: Dict[Enemy, int] = {}
+        self.enemy_cols = {name: np.zeros(0) for name in ENEMY_COLUMNS}
+        self.projectiles: List[Projectile] = []
+        self.projectile_cols = {name: np.zeros(0) for name in PROJECTILE_COLUMNS}
+        self.projectile_cols["target"] = np.zeros(0, dtype=np.int64)
+
+    def sync_enemies(self) -> None:
+        new_enemies = [enemy for enemy in self.game.enemies if enemy not in self.enemy_rows]
+        if not new_enemies:
+            return
+        rows = []
+        for enemy in new_enemies:
+            self.enemy_rows[enemy] = len(self.enemies)
+            self.enemies.append(enemy)
+            enemy_type = enemy.enemy_type
+            target = enemy.target if enemy.target is not None else (math.nan, math.nan)
+            rows.append(
+                (
+                    enemy.pos.x,
+                    enemy.pos.y,
+                    enemy.rect.centerx,
+                    enemy.rect.centery,
+                    target[0],
+                    target[1],
+                    enemy.hp,
+                    enemy.base_speed,
+                    enemy.reward,
+                    enemy.melee_timer,
+                    enemy.ranged_timer,
+                    enemy_type.melee_damage,
+                    enemy_type.melee_range,
+                    enemy_type.melee_cooldown,
+                    enemy_type.ranged_damage,
+                    enemy_type.ranged_range,
+                    enemy_type.ranged_cooldown,
+                )
+            )
+        block = np.array(rows, dtype=float)
+        for i, name in enumerate(ENEMY_COLUMNS):
+            self.enemy_cols[name] = np.concatenate([self.enemy_cols[name], block[:, i]])
+
+    def timers(self, enemy: Enemy) -> Tuple[float, float]:
+        row = self.enemy_rows.get(enemy)
+        if row is None:
+            return enemy.melee_timer, enemy.ranged_timer
+        return float(self.enemy_cols["melee_timer"][row]), float(self.enemy_cols["ranged_timer"][row])
+
+    def step(self, dt: float) -> None:
+        profiler = self.game.profiler
+        mark = profiler.start()
+        self.sync_enemies()
+        self.update_enemies(dt)
+        mark = profiler.lap("enemies", mark)
+        self.update_towers(dt)
+        mark = profiler.lap("towers", mark)
+        self.update_projectiles(dt)
+        profiler.lap("projectiles", mark)
+
+    def update_enemies(self, dt: float) -> None:
+        if not self.enemies:
+            return
+        cols = self.enemy_cols
+        exhausted = np.isnan(cols["tx"])
+        cols["melee_timer"][~exhausted] += dt
+        cols["ranged_timer"][~exhausted] += dt
+        dx = cols["tx"] - cols["x"]
+        dy = cols["ty"] - cols["y"]
+        distance = np.sqrt(dx * dx + dy * dy)
+        arrived = ~exhausted & (distance < 1)
+        finished = exhausted.copy()
+        moving = np.flatnonzero(~exhausted & ~arrived)
+        start_x = cols["x"].copy()
+        start_y = cols["y"].copy()
+        pending = moving
+        after = -1
+        while True:
+            previous = self.advance_enemies(arrived, after, finished)
+            self.move_enemies(pending, start_x, start_y, dx, dy, distance, dt)
+            destroyed_row = self.enemy_attacks(pending)
+            if destroyed_row is None:
+                break
+            for row, (index, target) in previous.items():
+                if row > destroyed_row:
+                    enemy = self.enemies[row]
+                    enemy.current_index, enemy.target = index, target
+                    finished[row] = False
+            after = destroyed_row
+            pending = pending[pending > destroyed_row]
+        for row in moving:
+            self.game.enemy_grid.move(self.enemies[row])
+        for row in np.flatnonzero(finished):
+            self.game.lives -= 1
+            self.enemies[row].kill()
+        if finished.any():
+            self.remove_enemies(~finished)
+
+    def advance_enemies(
+        self, arrived: "np.ndarray", after: int, finished: "np.ndarray"
+    ) -> Dict[int, Tuple[int, Optional[Tuple[float, float]]]]:
+        cols = self.enemy_cols
+        previous = {}
+        for row in np.flatnonzero(arrived[after + 1 :]).tolist():
+            row += after + 1
+            enemy = self.enemies[row]
+            previous[row] = (enemy.current_index, enemy.target)
+            enemy.advance(self.game)
+            if enemy.target is None:
+                finished[row] = True
+            else:
+                cols["tx"][row], cols["ty"][row] = enemy.target
+        return previous
+
+    def move_enemies(
+        self,
+        rows: "np.ndarray",
+        start_x: "np.ndarray",
+        start_y: "np.ndarray",
+        dx: "np.ndarray",
+        dy: "np.ndarray",
+        distance: "np.ndarray",
+        dt: float,
+    ) -> None:
+        cols = self.enemy_cols
+        px = start_x[rows]
+        py = start_y[rows]
+        modifier = np.ones(len(rows))
+        for tower in self.game.towers:
+            if not tower.is_wall:
+                continue
+            tx, ty = tower.rect.center
+            wall_dist = np.sqrt((px - tx) ** 2 + (py - ty) ** 2)
+            inside = wall_dist <= tower.slow_radius
+            modifier[inside] = np.minimum(modifier[inside], tower.tower_type.slow_factor)
+        speed = cols["speed"][rows] * np.maximum(0.1, modifier)
+        ux = dx[rows] / distance[rows]
+        uy = dy[rows] / distance[rows]
+        cols["x"][rows] = px + ux * speed * dt
+        cols["y"][rows] = py + uy * speed * dt
+        for row, x, y in zip(rows.tolist(), cols["x"][rows].tolist(), cols["y"][rows].tolist()):
+            enemy = self.enemies[row]
+            enemy.pos.update(x, y)
+            enemy.rect.center = (x, y)
+            cols["cx"][row], cols["cy"][row] = enemy.rect.center
+
+    def enemy_attacks(self, rows: "np.ndarray") -> Optional[int]:
+        towers = [tower for tower in self.game.towers if tower.alive()]
+        if not towers or not len(rows):
+            return None
+        cols = self.enemy_cols
+        centers = np.array([tower.rect.center for tower in towers], dtype=float)
+        ex = cols["cx"][rows][:, None]
+        ey = cols["cy"][rows][:, None]
+        dist = np.sqrt((centers[:, 0] - ex) ** 2 + (centers[:, 1] - ey) ** 2)
+        reach = np.maximum(cols["melee_range"][rows], cols["ranged_range"][rows])
+        dist[dist > reach[:, None]] = np.inf
+        closest = np.argmin(dist, axis=1)
+        closest_dist = dist[np.arange(len(rows)), closest]
+        tied = (dist == closest_dist[:, None]).sum(axis=1) > 1
+        melee = (closest_dist <= cols["melee_range"][rows]) & (cols["melee_timer"][rows] >= cols["melee_cooldown"][rows])
+        ranged = (
+            ~melee
+            & (closest_dist <= cols["ranged_range"][rows])
+            & (cols["ranged_timer"][rows] >= cols["ranged_cooldown"][rows])
+        )
+        candidates = np.flatnonzero(np.isfinite(closest_dist) & (melee | ranged | tied))
+        for i in candidates.tolist():
+            row = int(rows[i])
+            enemy = self.enemies[row]
+            if tied[i]:
+                tower, tower_dist = enemy.closest_tower(self.game)
+            else:
+                tower, tower_dist = towers[closest[i]], closest_dist[i]
+            if tower is None:
+                continue
+            if tower_dist <= cols["melee_range"][row] and cols["melee_timer"][row] >= cols["melee_cooldown"][row]:
+                tower.take_damage(cols["melee_damage"][row])
+                cols["melee_timer"][row] = 0.0
+            elif tower_dist <= cols["ranged_range"][row] and cols["ranged_timer"][row] >= cols["ranged_cooldown"][row]:
+                tower.take_damage(cols["ranged_damage"][row])
+                cols["ranged_timer"][row] = 0.0
+            else:
+                continue
+            if not tower.alive():
+                return row
+        return None
+
+    def remove_enemies(self, keep: "np.ndarray") -> None:
+        remap = np.full(len(keep), -1, dtype=np.int64)
+        remap[keep] = np.arange(int(keep.sum()))
+        for name in ENEMY_COLUMNS:
+            self.enemy_cols[name] = self.enemy_cols[name][keep]
+        self.enemies = [enemy for enemy, kept in zip(self.enemies, keep.tolist()) if kept]
+        self.enemy_rows = {enemy: row for row, enemy in enumerate(self.enemies)}
+        targets = self.projectile_cols["target"]
+        alive_target = targets >= 0
+        targets[alive_target] = remap[targets[alive_target]]
+
+    def update_towers(self, dt: float) -> None:
+        ready = []
+        for tower in self.game.towers:
+            if tower.is_wall:
+                continue
+            tower.time_since_last_shot += dt
+            if tower.time_since_last_shot >= tower.fire_rate:
+                ready.append(tower)
+        if not ready or not self.enemies:
+            return
+        cols = self.enemy_cols
+        centers = np.array([tower.rect.center for tower in ready], dtype=float)
+        ranges = np.array([tower.range for tower in ready])
+        dist = np.sqrt((cols["cx"][None, :] - centers[:, :1]) ** 2 + (cols["cy"][None, :] - centers[:, 1:]) ** 2)
+        dist[dist > ranges[:, None]] = np.inf
+        closest = np.argmin(dist, axis=1)
+        closest_dist = dist[np.arange(len(ready)), closest]
+        tied = (dist == closest_dist[:, None]).sum(axis=1) > 1
+        fired = []
+        for i, tower in enumerate(ready):
+            if not np.isfinite(closest_dist[i]):
+                continue
+            if tied[i] or tower.targeting != "closest":
+                target = tower.find_target(self.game.enemy_grid)
+            else:
+                target = self.enemies[closest[i]]
+            fired.append(tower.launch(target, self.game))
+            tower.time_since_last_shot = 0.0
+        self.add_projectiles(fired)
+
+    def add_projectiles(self, projectiles: List[Projectile]) -> None:
+        if not projectiles:
+            return
+        self.projectiles.extend(projectiles)
+        block = np.array(
+            [(p.pos.x, p.pos.y, self.enemy_rows[p.target], p.damage, p.speed, p.hit_radius) for p in projectiles],
+            dtype=float,
+        )
+        for i, name in enumerate(PROJECTILE_COLUMNS):
+            column = block[:, i].astype(np.int64) if name == "target" else block[:, i]
+            self.projectile_cols[name] = np.concatenate([self.projectile_cols[name], column])
+
+    def update_projectiles(self, dt: float) -> None:
+        if not self.projectiles:
+            return
+        cols = self.projectile_cols
+        enemy_cols = self.enemy_cols
+        count = len(self.projectiles)
+        targets = cols["target"]
+        has_target = targets >= 0
+        safe_targets = np.where(has_target, targets, 0)
+        if self.enemies:
+            dx = enemy_cols["cx"][safe_targets] - cols["x"]
+            dy = enemy_cols["cy"][safe_targets] - cols["y"]
+        else:
+            dx = dy = np.zeros(count)
+        distance = np.sqrt(dx * dx + dy * dy)
+        hit = has_target & (distance <= cols["speed"] * dt + cols["radius"])
+        killed_at = np.full(len(self.enemies), count, dtype=np.int64)
+        keep = has_target.copy()
+        for i in np.flatnonzero(hit).tolist():
+            keep[i] = False
+            if killed_at[targets[i]] < i:
+                continue
+            for enemy, amount in self.projectiles[i].impacts(self.game.enemy_grid):
+                row = self.enemy_rows[enemy]
+                enemy_cols["hp"][row] -= amount
+                enemy.hp = float(enemy_cols["hp"][row])
+                if enemy.hp <= 0:
+                    self.game.money += int(enemy_cols["reward"][row])
+                    self.game.kills += 1
+                    enemy.kill()
+                    killed_at[row] = i
+        moving = keep.copy()
+        moving[has_target] &= killed_at[targets[has_target]] >= np.flatnonzero(has_target)
+        keep &= moving
+        rows = np.flatnonzero(moving)
+        cols["x"][rows] += dx[rows] / distance[rows] * cols["speed"][rows] * dt
+        cols["y"][rows] += dy[rows] / distance[rows] * cols["speed"][rows] * dt
+        for row, x, y in zip(rows.tolist(), cols["x"][rows].tolist(), cols["y"][rows].tolist()):
+            projectile = self.projectiles[row]
+            projectile.pos.update(x, y)
+            projectile.rect.center = (x, y)
+        for row in np.flatnonzero(~keep).tolist():
+            self.projectiles[row].kill()
+        if not keep.all():
+            for name in PROJECTILE_COLUMNS:
+                cols[name] = cols[name][keep]
+            self.projectiles = [p for p, kept in zip(self.projectiles, keep.tolist()) if kept]
+        enemy_alive = killed_at == count
+        if not enemy_alive.all():
+            self.remove_enemies(enemy_alive)
+
+
+Drawable = Tuple[object, pygame.Rect, object, Callable[[], None]]
+
+
+class DirtyRenderer:
+    def __init__(self, max_rects: int = MAX_DIRTY_RECTS) -> None:
+        self.max_rects = max_rects
+        self.previous: Dict[object, Tuple[Tuple[int, int, int, int], object]] = {}
+        self.needs_full_redraw = True
+
+    def reset(self) -> None:
+        self.previous.clear()
+        self.needs_full_redraw = True
+
+    def render(
+        self, surface: pygame.Surface, background: pygame.Surface, drawables: List[Drawable]
+    ) -> List[pygame.Rect]:
+        current = {key: (tuple(rect), signature) for key, rect, signature, _ in drawables}
+        if self.needs_full_redraw:
+            surface.blit(background, (0, 0))
+            for _, _, _, draw in drawables:
+                draw()
+            self.previous = current
+            self.needs_full_redraw = False
+            return [surface.get_rect()]
+        dirty = []
+        for key, state in current.items():
+            before = self.previous.get(key)
+            if before is None:
+                dirty.append(pygame.Rect(state[0]))
+            elif before != state:
+                dirty.append(pygame.Rect(before[0]).union(state[0]))
+        dirty.extend(pygame.Rect(state[0]) for key, state in self.previous.items() if key not in current)
+        self.previous = current
+        if not dirty:
+            return []
+        if len(dirty) > self.max_rects:
+            self.needs_full_redraw = True
+            return self.render(surface, background, drawables)
+        rects = [rect for _, rect, _, _ in drawables]
+        bounds = surface.get_rect()
+        for area in dirty:
+            area = area.clip(bounds)
+            if not area:
+                continue
+            surface.set_clip(area)
+            surface.blit(background, area, area)
+            for index in area.collidelistall(rects):
+                drawables[index][3]()
+        surface.set_clip(None)
+        return dirty
+
+
+class TextCache:
+    def __init__(self, capacity: int = TEXT_CACHE_SIZE) -> None:
+        self.capacity = capacity
+        self.labels: "OrderedDict[Tuple[pygame.font.Font, str, Color], pygame.Surface]" = OrderedDict()
+
+    def render(self, font: pygame.font.Font, text: str, color: Color) -> pygame.Surface:
+        key = (font, text, color)
+        label = self.labels.get(key)
+        if label is not None:
+            self.labels.move_to_end(key)
+            return label
+        label = font.render(text, True, color)
+        self.labels[key] = label
+        if len(self.labels) > self.capacity:
+            self.labels.popitem(last=False)
+        return label
+
+    def clear(self) -> None:
+        self.labels.clear()
+
+
+class FrameProfiler:
+    def __init__(self, window: int = PROFILE_WINDOW, sections: Sequence[str] = PROFILE_SECTIONS):
+        self.enabled = False
+        self.sections = tuple(sections)
+        self.samples: Dict[str, deque] = {name: deque(maxlen=window) for name in self.sections}
+        self.current: Dict[str, float] = dict.fromkeys(self.sections, 0.0)
+        self.frames = 0
+        self.panel: Optional[pygame.Surface] = None
+        self.panel_version = 0
+
+    def start(self) -> float:
+        return time.perf_counter() if self.enabled else 0.0
+
+    def lap(self, name: str, mark: float) -> float:
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self.current[name] += now - mark
+        return now
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        for name in self.sections:
+            self.samples[name].append(self.current[name] * 1000)
+            self.current[name] = 0.0
+        self.frames += 1
+
+    def percentiles(self, name: str) -> Tuple[float, float, float]:
+        values = sorted(self.samples[name])
+        if not values:
+            return 0.0, 0.0, 0.0
+        last = len(values) - 1
+        return tuple(values[round(last * fraction)] for fraction in (0.5, 0.95, 0.99))
+
+    def overlay(self, font: pygame.font.Font) -> pygame.Surface:
+        if self.panel is None or self.frames % PROFILE_REFRESH_FRAMES == 0:
+            rows = [("section", "p50", "p95", "p99")]
+            for name in self.sections:
+                rows.append((name, *(f"{value:.2f}" for value in self.percentiles(name))))
+            name_width = max(font.size(row[0])[0] for row in rows) + 12
+            column_width = font.size("000.00")[0] + 12
+            line_height = font.get_linesize()
+            self.panel = pygame.Surface((name_width + column_width * 3 + 16, line_height * len(rows) + 12), pygame.SRCALPHA)
+            self.panel.fill((0, 0, 0, 170))
+            for i, row in enumerate(rows):
+                y = 6 + i * line_height
+                self.panel.blit(font.render(row[0], True, (230, 240, 200)), (8, y))
+                for j, text in enumerate(row[1:]):
+                    label = font.render(text, True, (230, 240, 200))
+                    self.panel.blit(label, (8 + name_width + column_width * (j + 1) - label.get_width(), y))
+            self.panel_version += 1
+        return self.panel
+
+    def export_csv(self, path: Path) -> None:
+        rows = zip(*(self.samples[name] for name in self.sections))
+        first = self.frames - len(self.samples[self.sections[0]])
+        with path.open("w", encoding="utf-8") as handle:
+            handle.write("frame," + ",".join(f"{name}_ms" for name in self.sections) + "\n")
+            for i, row in enumerate(rows):
+                handle.write(f"{first + i}," + ",".join(f"{value:.4f}" for value in row) + "\n")
+
+
 class HomeBase:
     def __init__(self, tile: Tile):
         self.tile = tile
         self.radius = 32
-        self.font = pygame.font.SysFont(FONT_NAME, 20)
+        self.font: Optional[pygame.font.Font] = None
 
-    def draw(self, surface: pygame.Surface, lives: int) -> None:
+    def draw(self, surface: pygame.Surface, lives: int, labels: TextCache) -> None:
+        if self.font is None:
+            self.font = pygame.font.SysFont(FONT_NAME, 20)
         center = self.tile.center
         outer_color = (80, 160, 220)
         inner_color = (20, 35, 60)
         pygame.draw.circle(surface, outer_color, center, self.radius)
         pygame.draw.circle(surface, inner_color, center, self.radius - 8)
-        text = self.font.render(str(max(lives, 0)), True, (240, 240, 240))
+        text = labels.render(self.font, str(max(lives, 0)), (240, 240, 240))
         text_rect = text.get_rect(center=center)
         surface.blit(text, text_rect)
 
+    def bounds(self) -> pygame.Rect:
+        rect = pygame.Rect(0, 0, self.radius * 2 + 4, self.radius * 2 + 4)
+        rect.center = self.tile.center
+        return rect
+
 
 class MusicPlayer:
-    def __init__(self, base_path: Path):
-        self.enabled = True
+    def __init__(self, base_path: Path, enabled: bool = True):
+        self.enabled = enabled
+        if not enabled:
+            return
         try:
             pygame.mixer.init()
         except pygame.error as exc:
@@ -683,19 +1803,56 @@ class MusicPlayer:
 
 
 class Game:
-    def __init__(self) -> None:
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Hex Tower Defense")
+    def __init__(
+        self,
+        vectorized: bool = False,
+        headless: bool = False,
+        pathing: str = "flow",
+        dirty_rendering: bool = False,
+        endless: bool = False,
+        tick_rate: int = TICK_RATE,
+        interpolate: bool = False,
+        autosave: bool = False,
+        profile: bool = False,
+        map_radius: int = MAP_RADIUS,
+    ) -> None:
+        self.headless = headless
+        self.map_radius = map_radius
+        self.pathing = pathing
+        self.dirty_rendering = dirty_rendering
+        self.endless = endless
+        self.tick_rate = tick_rate
+        self.tick_dt = 1 / tick_rate
+        self.recorder = None
+        self.autosave = autosave
+        self.save_path = Path(__file__).resolve().parent / "savegame.tds"
+        self.profiler = FrameProfiler()
+        self.profiler.enabled = profile
+        self.profile_path = Path(__file__).resolve().parent / "profile.csv"
+        self.interpolate = interpolate
+        self.accumulator = 0.0
+        self.previous_positions: Dict[pygame.sprite.Sprite, Tuple[float, float]] = {}
+        self.renderer = DirtyRenderer()
+        self.highlight_cache: Optional[Tuple[Tile, pygame.Surface, pygame.Rect]] = None
+        self.labels = TextCache()
+        self.enemy_pool = SpritePool(Enemy)
+        self.projectile_pool = SpritePool(Projectile)
+        self.tower_text: Optional[Tuple[str, str]] = None
+        self.screen: Optional[pygame.Surface] = None
+        if not headless:
+            pygame.init()
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Hex Tower Defense")
+            self.font = pygame.font.SysFont(FONT_NAME, 22)
+            self.title_font = pygame.font.SysFont(FONT_NAME, 64)
+            self.sub_title_font = pygame.font.SysFont(FONT_NAME, 30)
+            self.button_font = pygame.font.SysFont(FONT_NAME, 26)
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont(FONT_NAME, 22)
-        self.title_font = pygame.font.SysFont(FONT_NAME, 64)
-        self.sub_title_font = pygame.font.SysFont(FONT_NAME, 30)
-        self.button_font = pygame.font.SysFont(FONT_NAME, 26)
-        self.music = MusicPlayer(Path(__file__).resolve().parent)
+        self.music = MusicPlayer(Path(__file__).resolve().parent, enabled=not headless)
         self.enemy_types = ENEMY_TYPES
         self.tower_types = TOWER_TYPES
-        self.wave_definitions = generate_wave_definitions(600)
+        self.wave_definitions = WaveSource(None if endless else TOTAL_WAVES)
+        self.vectorized = vectorized
         self.state = "intro"
         self.running = True
         self.rules_text = [
@@ -720,24 +1877,38 @@ class Game:
         self.music.play_menu()
 
     def setup_gameplay(self) -> None:
-        self.hex_map = HexMap(MAP_RADIUS, HEX_SIZE, MAP_OFFSET)
+        SPRITE_ATLAS.preload(self.tower_types, self.enemy_types)
+        self.hex_map = HexMap(self.map_radius, HEX_SIZE, MAP_OFFSET)
+        self.previous_positions = {}
+        self.tick_count = 0
+        self.flow_field = self.hex_map.flow_field if self.pathing == "flow" else None
         self.enemies = pygame.sprite.Group()
         self.towers = pygame.sprite.Group()
         self.projectiles = pygame.sprite.Group()
+        self.enemy_grid = SpatialGrid(GRID_CELL_SIZE)
+        self.tower_grid = SpatialGrid(GRID_CELL_SIZE)
+        self.slow_field = SlowField(self.towers)
+        self.vector_engine = VectorEngine(self) if self.vectorized else None
         self.tower_keys = list(self.tower_types.keys())
         self.selected_tower_key = self.tower_keys[0]
         self.money = 200
         self.lives = 20
-        self.wave_manager = WaveManager(self.wave_definitions, cooldown_duration=4.0)
+        self.kills = 0
+        self.wave_manager = WaveManager(self.wave_definitions, cooldown_duration=4.0, auto_start=self.endless)
         self.home_base = HomeBase(self.hex_map.tiles[self.hex_map.base_coord])
         self.selected_tile: Optional[Tile] = self.hex_map.tiles.get(self.hex_map.base_coord)
 
     def run(self) -> None:
         while self.running:
-            dt = self.clock.tick(FPS) / 1000
+            self.accumulator += min(self.clock.tick(FPS) / 1000, MAX_FRAME_TIME)
             self.handle_events()
-            self.update(dt)
-            self.draw()
+            while self.accumulator >= self.tick_dt:
+                self.step()
+                self.accumulator -= self.tick_dt
+            self.draw_interpolated(self.accumulator / self.tick_dt)
+            self.profiler.end_frame()
+        if self.recorder is not None:
+            self.recorder.close(self)
         self.music.stop()
         pygame.quit()
         sys.exit()
@@ -784,15 +1955,36 @@ class Game:
                 tile = self.hex_map.get_tile_at_pixel(*event.pos)
                 if tile:
                     self.selected_tile = tile
+                    self.record_command("build", tile.coord, self.selected_tower_key)
                     self.try_build_tower(tile)
             elif event.button == 3:
+                if self.selected_tile:
+                    self.record_command("heal", self.selected_tile.coord)
                 self.try_heal_selected_tower()
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_n:
+                self.record_command("next_wave")
                 self.wave_manager.start_next_wave()
+            elif event.key == pygame.K_F2:
+                self.profiler.enabled = not self.profiler.enabled
+                self.renderer.reset()
+            elif event.key == pygame.K_F4:
+                self.profiler.export_csv(self.profile_path)
+            elif event.key == pygame.K_F5:
+                self.save_game()
+            elif event.key == pygame.K_F9:
+                self.load_game()
+            elif event.key == pygame.K_F3:
+                self.dirty_rendering = not self.dirty_rendering
+                self.renderer.reset()
             elif event.key in (pygame.K_SPACE, pygame.K_RETURN):
                 if self.selected_tile:
+                    self.record_command("build", self.selected_tile.coord, self.selected_tower_key)
                     self.try_build_tower(self.selected_tile)
+            elif event.key == pygame.K_t:
+                if self.selected_tile:
+                    self.record_command("target", self.selected_tile.coord)
+                    self.try_cycle_targeting(self.selected_tile)
             elif pygame.K_1 <= event.key <= pygame.K_9:
                 index = event.key - pygame.K_1
                 if index < len(self.tower_keys):
@@ -800,7 +1992,15 @@ class Game:
             else:
                 self.handle_keyboard_selection(event.key)
 
+    def record_command(
+        self, command: str, coord: Optional[Tuple[int, int]] = None, tower_key: Optional[str] = None
+    ) -> None:
+        if self.recorder is not None:
+            self.recorder.record(self.tick_count, command, coord, tower_key)
+
     def start_game(self) -> None:
+        if self.recorder is not None:
+            self.recorder.begin(self)
         self.setup_gameplay()
         self.state = "playing"
         self.wave_manager.start_next_wave()
@@ -840,8 +2040,10 @@ class Game:
         if self.money < tower_type.cost:
             return
         tower = Tower(tile, tower_type)
+        tower.game = self
         tile.tower = tower
         self.towers.add(tower)
+        self.tower_changed(tower)
         self.money -= tower_type.cost
 
     def try_upgrade_tower(self, tower: Tower) -> None:
@@ -852,6 +2054,11 @@ class Game:
             return
         self.money -= cost
         tower.upgrade()
+        self.tower_changed(tower)
+
+    def try_cycle_targeting(self, tile: Tile) -> None:
+        if tile.tower is not None and not tile.tower.is_wall:
+            tile.tower.cycle_targeting()
 
     def heal_cost(self, tower: Tower) -> int:
         missing_hp = tower.max_hp - tower.hp
@@ -875,30 +2082,72 @@ class Game:
         self.money -= cost
         tower.heal(missing_hp)
 
+    def tower_changed(self, tower: Tower) -> None:
+        self.hex_map.flow_field.update_tile(tower.tile.coord)
+        if tower.is_wall:
+            self.slow_field.invalidate()
+
     def get_speed_modifier(self, position: pygame.Vector2) -> float:
-        modifier = 1.0
-        for tower in self.towers:
-            if not tower.is_wall:
-                continue
-            distance = pygame.Vector2(tower.rect.center).distance_to(position)
-            if distance <= tower.tower_type.slow_radius:
-                modifier = min(modifier, tower.tower_type.slow_factor)
-        return max(0.1, modifier)
+        return self.slow_field.modifier(position.x, position.y)
+
+    def step(self) -> None:
+        if self.interpolate and self.state == "playing":
+            self.previous_positions = {
+                sprite: (sprite.pos.x, sprite.pos.y) for group in (self.enemies, self.projectiles) for sprite in group
+            }
+        self.update(self.tick_dt)
 
     def update(self, dt: float) -> None:
         if self.state != "playing":
             return
+        self.tick_count += 1
+        wave_active = self.wave_manager.active
+        profiler = self.profiler
+        mark = profiler.start()
         self.wave_manager.update(dt, self)
-        for enemy in list(self.enemies):
-            enemy.update(dt, self)
-        for tower in self.towers:
-            tower.update(dt, self)
-        for projectile in list(self.projectiles):
-            projectile.update(dt)
+        mark = profiler.lap("waves", mark)
+        self.tower_grid.rebuild(self.towers)
+        if self.vector_engine is not None:
+            self.vector_engine.step(dt)
+        else:
+            for enemy in list(self.enemies):
+                enemy.update(dt, self)
+            mark = profiler.lap("enemies", mark)
+            for tower in self.towers:
+                tower.update(dt, self)
+            mark = profiler.lap("towers", mark)
+            for projectile in list(self.projectiles):
+                projectile.update(dt)
+            profiler.lap("projectiles", mark)
         if self.lives <= 0:
             self.finish_game("Defense failed!")
         elif self.all_waves_cleared():
-            self.finish_game("All 600 waves have been defended!")
+            self.finish_game(f"All {self.wave_manager.total_waves} waves have been defended!")
+        elif self.autosave and wave_active and not self.wave_manager.active:
+            self.save_game()
+
+    def save_game(self) -> None:
+        self.save_path.write_bytes(save_snapshot(self))
+
+    def load_game(self) -> None:
+        if not self.save_path.exists():
+            return
+        load_snapshot(self, self.save_path.read_bytes())
+        self.renderer.reset()
+        self.music.play_game()
+
+    def draw_interpolated(self, alpha: float) -> None:
+        if not self.interpolate or self.state != "playing":
+            self.draw()
+            return
+        moved = []
+        for sprite, (x, y) in self.previous_positions.items():
+            if sprite.alive():
+                moved.append((sprite, sprite.rect.center))
+                sprite.rect.center = (x + (sprite.pos.x - x) * alpha, y + (sprite.pos.y - y) * alpha)
+        self.draw()
+        for sprite, center in moved:
+            sprite.rect.center = center
 
     def draw(self) -> None:
         if self.state == "intro":
@@ -906,33 +2155,107 @@ class Game:
         elif self.state == "rules":
             self.draw_rules()
         elif self.state == "playing":
+            if self.dirty_rendering:
+                mark = self.profiler.start()
+                dirty = self.draw_gameplay_dirty()
+                self.profiler.lap("dirty", mark)
+                pygame.display.update(dirty)
+                return
             self.draw_gameplay()
+            if self.profiler.enabled:
+                self.screen.blit(self.profiler.overlay(self.font), self.profiler_origin())
         elif self.state == "outro":
             self.draw_outro()
+        self.renderer.reset()
         pygame.display.flip()
 
     def draw_gameplay(self) -> None:
-        self.screen.fill((15, 20, 35))
+        profiler = self.profiler
+        mark = profiler.start()
         self.hex_map.draw(self.screen, self.selected_tile)
-        self.home_base.draw(self.screen, self.lives)
+        mark = profiler.lap("map", mark)
+        self.home_base.draw(self.screen, self.lives, self.labels)
         self.towers.draw(self.screen)
         self.enemies.draw(self.screen)
         self.projectiles.draw(self.screen)
-        for enemy in self.enemies:
-            enemy.draw_health(self.screen)
-        for tower in self.towers:
-            tower.draw_health(self.screen)
+        mark = profiler.lap("sprites", mark)
+        self.screen.blits(
+            [(unit.health_bar_image(), unit.health_bar_rect()) for group in (self.enemies, self.towers) for unit in group],
+            doreturn=False,
+        )
+        mark = profiler.lap("health", mark)
         self.draw_ui()
-
-    def draw_ui(self) -> None:
-        wave_total = len(self.wave_manager.waves)
-        wave_current = min(self.wave_manager.current_wave + 1, wave_total)
+        profiler.lap("ui", mark)
+
+    def profiler_origin(self) -> Tuple[int, int]:
+        panel = self.profiler.overlay(self.font)
+        return WIDTH - panel.get_width() - 20, 20
+
+    def draw_gameplay_dirty(self) -> List[pygame.Rect]:
+        screen = self.screen
+        if self.hex_map.layer is None or self.hex_map.dirty_tiles:
+            self.hex_map.draw(screen, None)
+            self.renderer.reset()
+        drawables: List[Drawable] = []
+        tile = self.selected_tile
+        if tile is not None:
+            outline, outline_rect = self.highlight_overlay(tile)
+            drawables.append(
+                ("highlight", outline_rect, tile.coord, lambda: screen.blit(outline, outline_rect))
+            )
+        drawables.append(("base", self.home_base.bounds(), self.lives, lambda: self.home_base.draw(screen, self.lives, self.labels)))
+        for group in (self.towers, self.enemies, self.projectiles):
+            for sprite in group:
+                drawables.append((sprite, sprite.rect, None, lambda s=sprite: screen.blit(s.image, s.rect)))
+        for group in (self.enemies, self.towers):
+            for sprite in group:
+                drawables.append(
+                    (
+                        ("health", sprite),
+                        sprite.health_bar_rect(),
+                        sprite.health_bar_width(),
+                        lambda s=sprite: screen.blit(s.health_bar_image(), s.health_bar_rect()),
+                    )
+                )
+        for i, text in enumerate(self.ui_lines()):
+            label = self.labels.render(self.font, text, (240, 240, 240))
+            rect = label.get_rect(topleft=(20, 20 + i * 26))
+            drawables.append((("ui", i), rect, text, lambda l=label, r=rect: screen.blit(l, r)))
+        if self.profiler.enabled:
+            panel = self.profiler.overlay(self.font)
+            panel_rect = panel.get_rect(topleft=self.profiler_origin())
+            drawables.append(("profiler", panel_rect, self.profiler.panel_version, lambda: screen.blit(panel, panel_rect)))
+        return self.renderer.render(screen, self.hex_map.layer, drawables)
+
+    def highlight_overlay(self, tile: Tile) -> Tuple[pygame.Surface, pygame.Rect]:
+        if self.highlight_cache is None or self.highlight_cache[0] is not tile:
+            points = tile.polygon(self.hex_map.hex_size - 1)
+            xs = [x for x, _ in points]
+            ys = [y for _, y in points]
+            rect = pygame.Rect(int(min(xs)), int(min(ys)), 0, 0)
+            rect.width = int(max(xs)) - rect.x + 1
+            rect.height = int(max(ys)) - rect.y + 1
+            rect.inflate_ip(8, 8)
+            overlay = pygame.Surface(rect.size, pygame.SRCALPHA)
+            pygame.draw.polygon(overlay, (255, 255, 255), [(x - rect.x, y - rect.y) for x, y in points], 2)
+            self.highlight_cache = (tile, overlay, rect)
+        return self.highlight_cache[1], self.highlight_cache[2]
+
+    def ui_lines(self) -> List[str]:
+        wave_total = self.wave_manager.total_waves
+        wave_current = self.wave_manager.current_wave + 1
+        wave_text = f"Wave: {wave_current}" if wave_total is None else f"Wave: {min(wave_current, wave_total)}/{wave_total}"
         selected_type = self.tower_types[self.selected_tower_key]
-        tower_text = " / ".join(
-            f"{idx + 1}:{self.tower_types[key].name}({self.tower_types[key].cost})" +
-            ("*" if key == self.selected_tower_key else "")
-            for idx, key in enumerate(self.tower_keys)
-        )
+        if self.tower_text is None or self.tower_text[0] != self.selected_tower_key:
+            self.tower_text = (
+                self.selected_tower_key,
+                " / ".join(
+                    f"{idx + 1}:{self.tower_types[key].name}({self.tower_types[key].cost})" +
+                    ("*" if key == self.selected_tower_key else "")
+                    for idx, key in enumerate(self.tower_keys)
+                ),
+            )
+        tower_text = self.tower_text[1]
         cooldown = (
             "ready" if self.wave_manager.cooldown_remaining <= 0 else f"{self.wave_manager.cooldown_remaining:0.1f}s"
         )
@@ -948,6 +2271,8 @@ class Game:
                 upgrade_text = (
                     f"Upgrade cost: {tower.upgrade_cost()} (Lv {tower.level}/{tower.max_level})"
                 )
+            if not tower.is_wall:
+                upgrade_text += f" — [T] Target: {tower.targeting}"
             missing_hp = tower.max_hp - tower.hp
             if missing_hp > 0:
                 heal_cost = self.heal_cost(tower)
@@ -956,10 +2281,10 @@ class Game:
                 )
             else:
                 heal_text = "Tower is at full health"
-        texts = [
+        return [
             f"Money: {self.money}",
             f"Lives: {self.lives}",
-            f"Wave: {wave_current}/{wave_total}",
+            wave_text,
             f"Selected: {selected_type.name} (Cost {selected_type.cost})",
             f"[1-{len(self.tower_keys)}] {tower_text}",
             f"Next wave cooldown: {cooldown} — press N when ready",
@@ -967,16 +2292,18 @@ class Game:
             upgrade_text,
             heal_text,
         ]
-        for i, text in enumerate(texts):
-            label = self.font.render(text, True, (240, 240, 240))
+
+    def draw_ui(self) -> None:
+        for i, text in enumerate(self.ui_lines()):
+            label = self.labels.render(self.font, text, (240, 240, 240))
             self.screen.blit(label, (20, 20 + i * 26))
 
     def draw_intro(self) -> None:
         self.screen.fill((8, 12, 25))
-        title = self.title_font.render("Hex Tower Defense", True, (245, 245, 245))
+        title = self.labels.render(self.title_font, "Hex Tower Defense", (245, 245, 245))
         title_rect = title.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 120))
         self.screen.blit(title, title_rect)
-        subtitle = self.sub_title_font.render("Strategize and hold the line", True, (200, 200, 220))
+        subtitle = self.labels.render(self.sub_title_font, "Strategize and hold the line", (200, 200, 220))
         self.screen.blit(subtitle, subtitle.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 60)))
         mouse_pos = pygame.mouse.get_pos()
         self.draw_button(self.intro_buttons["start"], "Start", mouse_pos)
@@ -984,21 +2311,21 @@ class Game:
 
     def draw_rules(self) -> None:
         self.screen.fill((10, 15, 30))
-        title = self.title_font.render("Rules", True, (240, 240, 240))
+        title = self.labels.render(self.title_font, "Rules", (240, 240, 240))
         self.screen.blit(title, title.get_rect(center=(WIDTH // 2, 140)))
         for i, line in enumerate(self.rules_text):
-            label = self.sub_title_font.render(line, True, (230, 230, 240))
+            label = self.labels.render(self.sub_title_font, line, (230, 230, 240))
             self.screen.blit(label, (120, 240 + i * 48))
         self.draw_button(self.rules_back_button, "Back", pygame.mouse.get_pos())
 
     def draw_outro(self) -> None:
         self.screen.fill((5, 10, 20))
-        title = self.title_font.render("Game Over", True, (240, 240, 240))
+        title = self.labels.render(self.title_font, "Game Over", (240, 240, 240))
         self.screen.blit(title, title.get_rect(center=(WIDTH // 2, 150)))
-        result = self.sub_title_font.render(self.game_result or "", True, (200, 220, 255))
+        result = self.labels.render(self.sub_title_font, self.game_result or "", (200, 220, 255))
         self.screen.blit(result, result.get_rect(center=(WIDTH // 2, 230)))
         for i, line in enumerate(self.outro_summary):
-            label = self.button_font.render(line, True, (220, 220, 230))
+            label = self.labels.render(self.button_font, line, (220, 220, 230))
             self.screen.blit(label, label.get_rect(center=(WIDTH // 2, 320 + i * 40)))
         self.draw_button(self.outro_buttons["menu"], "Main Menu", pygame.mouse.get_pos())
 
@@ -1007,27 +2334,29 @@ class Game:
         base_color = (70, 120, 210) if hovered else (40, 70, 140)
         pygame.draw.rect(self.screen, base_color, rect, border_radius=14)
         pygame.draw.rect(self.screen, (255, 255, 255), rect, width=2, border_radius=14)
-        label = self.button_font.render(text, True, (255, 255, 255))
+        label = self.labels.render(self.button_font, text, (255, 255, 255))
         self.screen.blit(label, label.get_rect(center=rect.center))
 
     def finish_game(self, message: str) -> None:
         if self.state != "playing":
             return
-        total_waves = len(self.wave_manager.waves)
+        total_waves = self.wave_manager.total_waves
         current_wave = max(0, self.wave_manager.current_wave + 1)
         self.game_result = message
         self.outro_summary = [
-            f"Waves survived: {current_wave}/{total_waves}",
+            f"Waves survived: {current_wave}" if total_waves is None else f"Waves survived: {current_wave}/{total_waves}",
             f"Money left: {self.money}",
             f"Lives left: {max(self.lives, 0)}",
         ]
         self.state = "outro"
         self.music.play_menu()
+        if self.recorder is not None:
+            self.recorder.close(self)
 
     def all_waves_cleared(self) -> bool:
-        if not self.wave_manager.waves:
+        if not self.wave_manager.total_waves:
             return False
-        last_wave_index = len(self.wave_manager.waves) - 1
+        last_wave_index = self.wave_manager.total_waves - 1
         return (
             self.wave_manager.current_wave == last_wave_index
             and not self.wave_manager.active
@@ -1035,5 +2364,210 @@ class Game:
         )
 
 
+def pack_keys(out: bytearray, keys: Sequence[str]) -> None:
+    out.append(len(keys))
+    for key in keys:
+        encoded = key.encode("utf-8")
+        out.append(len(encoded))
+        out += encoded
+
+
+def unpack_keys(data: bytes, offset: int) -> Tuple[List[str], int]:
+    keys = []
+    for _ in range(data[offset]):
+        length = data[offset + 1]
+        keys.append(data[offset + 2 : offset + 2 + length].decode("utf-8"))
+        offset += 1 + length
+    return keys, offset + 1
+
+
+def save_snapshot(game: Game) -> bytes:
+    tower_keys = list(game.tower_types)
+    enemy_keys = list(game.enemy_types)
+    tower_index = {tower_type.name: i for i, tower_type in enumerate(game.tower_types.values())}
+    enemy_index = {enemy_type: i for i, enemy_type in enumerate(game.enemy_types.values())}
+    border_index = {id(game.hex_map.border_paths[coord]): i for i, coord in enumerate(game.hex_map.border_coords)}
+    out = bytearray(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SNAPSHOT_ENDLESS if game.endless else 0))
+    pack_keys(out, tower_keys)
+    pack_keys(out, enemy_keys)
+    out += SNAPSHOT_GAME.pack(
+        game.money, game.lives, game.kills, game.tick_count, tower_keys.index(game.selected_tower_key)
+    )
+    waves = game.wave_manager
+    out += SNAPSHOT_WAVES.pack(
+        waves.current_wave,
+        waves.time_since_last_spawn,
+        waves.active,
+        waves.entry_index,
+        waves.spawned_in_entry,
+        waves.cooldown_remaining,
+        waves.current_mob_cap,
+        waves.current_spawn_rate_multiplier,
+    )
+    out += SNAPSHOT_COUNT.pack(len(game.towers))
+    for tower in game.towers:
+        q, r = tower.tile.coord
+        out += SNAPSHOT_TOWER.pack(
+            q,
+            r,
+            tower_index[tower.tower_type.name],
+            tower.level,
+            TARGETING_MODES.index(tower.targeting),
+            tower.hp,
+            tower.time_since_last_shot,
+        )
+    for (q, r), next_hop in game.hex_map.flow_field.next_hops.items():
+        out.append(len(HEX_DIRECTIONS) if next_hop is None else HEX_DIRECTIONS.index((next_hop[0] - q, next_hop[1] - r)))
+    enemies = list(game.enemies)
+    out += SNAPSHOT_COUNT.pack(len(enemies))
+    for enemy in enemies:
+        target = enemy.target if enemy.target is not None else (math.nan, math.nan)
+        if game.vector_engine is not None:
+            melee, ranged = game.vector_engine.timers(enemy)
+        else:
+            melee, ranged = enemy.melee_timer, enemy.ranged_timer
+        out += SNAPSHOT_ENEMY.pack(
+            enemy_index[enemy.enemy_type],
+            border_index[id(enemy.path)],
+            enemy.current_index,
+            target[0],
+            target[1],
+            enemy.pos.x,
+            enemy.pos.y,
+            enemy.hp,
+            enemy.max_hp,
+            enemy.base_speed,
+            enemy.reward,
+            melee,
+            ranged,
+        )
+    rows = {enemy: row for row, enemy in enumerate(enemies)}
+    projectiles = [
+        projectile
+        for projectile in game.projectiles
+        if projectile.target in rows and projectile.target.generation == projectile.target_generation
+    ]
+    out += SNAPSHOT_COUNT.pack(len(projectiles))
+    for projectile in projectiles:
+        out += SNAPSHOT_PROJECTILE.pack(
+            rows[projectile.target],
+            projectile.pos.x,
+            projectile.pos.y,
+            projectile.damage,
+            projectile.speed,
+            projectile.splash_radius,
+            projectile.chain_count,
+            projectile.chain_range,
+        )
+    _, state, gauss = random.getstate()
+    out += SNAPSHOT_RNG.pack(*state, gauss is not None, gauss or 0.0)
+    return bytes(out)
+
+
+def load_snapshot(game: Game, data: bytes) -> None:
+    magic, version, flags = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("not a snapshot file")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    tower_keys, offset = unpack_keys(data, SNAPSHOT_HEADER.size)
+    enemy_keys, offset = unpack_keys(data, offset)
+    game.endless = bool(flags & SNAPSHOT_ENDLESS)
+    game.wave_definitions = WaveSource(None if game.endless else TOTAL_WAVES)
+    game.setup_gameplay()
+    game.state = "playing"
+    game.money, game.lives, game.kills, game.tick_count, selected = SNAPSHOT_GAME.unpack_from(data, offset)
+    game.selected_tower_key = tower_keys[selected]
+    offset += SNAPSHOT_GAME.size
+    waves = game.wave_manager
+    (
+        waves.current_wave,
+        waves.time_since_last_spawn,
+        waves.active,
+        waves.entry_index,
+        waves.spawned_in_entry,
+        waves.cooldown_remaining,
+        waves.current_mob_cap,
+        waves.current_spawn_rate_multiplier,
+    ) = SNAPSHOT_WAVES.unpack_from(data, offset)
+    offset += SNAPSHOT_WAVES.size
+    (count,) = SNAPSHOT_COUNT.unpack_from(data, offset)
+    offset += SNAPSHOT_COUNT.size
+    for q, r, key, level, targeting, hp, cooldown in SNAPSHOT_TOWER.iter_unpack(
+        data[offset : offset + count * SNAPSHOT_TOWER.size]
+    ):
+        tile = game.hex_map.tiles[(q, r)]
+        tower = Tower(tile, game.tower_types[tower_keys[key]])
+        for _ in range(level - 1):
+            tower.upgrade()
+        tower.targeting = TARGETING_MODES[targeting]
+        tower.hp = int(hp) if hp.is_integer() else hp
+        tower.time_since_last_shot = cooldown
+        tower.game = game
+        tile.tower = tower
+        game.towers.add(tower)
+    offset += count * SNAPSHOT_TOWER.size
+    flow_field = game.hex_map.flow_field
+    flow_field.rebuild()
+    for q, r in flow_field.next_hops:
+        direction = data[offset]
+        offset += 1
+        if direction < len(HEX_DIRECTIONS):
+            dq, dr = HEX_DIRECTIONS[direction]
+            flow_field.next_hops[(q, r)] = (q + dq, r + dr)
+    game.slow_field.invalidate()
+    (count,) = SNAPSHOT_COUNT.unpack_from(data, offset)
+    offset += SNAPSHOT_COUNT.size
+    enemies = []
+    for key, border, index, tx, ty, x, y, hp, max_hp, speed, reward, melee, ranged in SNAPSHOT_ENEMY.iter_unpack(
+        data[offset : offset + count * SNAPSHOT_ENEMY.size]
+    ):
+        enemy = game.enemy_pool.acquire(
+            game.hex_map.border_paths[game.hex_map.border_coords[border]], game.enemy_types[enemy_keys[key]]
+        )
+        enemy.current_index = index
+        enemy.target = None if math.isnan(tx) else (tx, ty)
+        enemy.pos.update(x, y)
+        enemy.rect.center = enemy.pos
+        enemy.hp, enemy.max_hp, enemy.base_speed, enemy.reward = hp, max_hp, speed, reward
+        enemy.melee_timer, enemy.ranged_timer = melee, ranged
+        enemy.game = game
+        game.enemies.add(enemy)
+        game.enemy_grid.insert(enemy)
+        enemies.append(enemy)
+    offset += count * SNAPSHOT_ENEMY.size
+    (count,) = SNAPSHOT_COUNT.unpack_from(data, offset)
+    offset += SNAPSHOT_COUNT.size
+    projectiles = []
+    for row, x, y, damage, speed, splash_radius, chain_count, chain_range in SNAPSHOT_PROJECTILE.iter_unpack(
+        data[offset : offset + count * SNAPSHOT_PROJECTILE.size]
+    ):
+        projectile = game.projectile_pool.acquire(
+            (x, y), enemies[row], damage, speed, game, splash_radius, chain_count, chain_range
+        )
+        game.projectiles.add(projectile)
+        projectiles.append(projectile)
+    offset += count * SNAPSHOT_PROJECTILE.size
+    *state, has_gauss, gauss = SNAPSHOT_RNG.unpack_from(data, offset)
+    random.setstate((3, tuple(state), gauss if has_gauss else None))
+    if game.vector_engine is not None:
+        game.vector_engine.sync_enemies()
+        game.vector_engine.add_projectiles(projectiles)
+
+
 if __name__ == "__main__":
-    Game().run()
+    game = Game(
+        vectorized="--vectorized" in sys.argv[1:],
+        pathing="line" if "--straight-paths" in sys.argv[1:] else "flow",
+        dirty_rendering="--dirty-rects" in sys.argv[1:],
+        endless="--endless" in sys.argv[1:],
+        tick_rate=int(sys.argv[sys.argv.index("--tick-rate") + 1]) if "--tick-rate" in sys.argv[1:] else TICK_RATE,
+        interpolate="--interpolate" in sys.argv[1:],
+        autosave="--autosave" in sys.argv[1:],
+        profile="--profile" in sys.argv[1:],
+    )
+    if "--record" in sys.argv[1:]:
+        from replay import ReplayRecorder
+
+        game.recorder = ReplayRecorder(Path(sys.argv[sys.argv.index("--record") + 1]))
+    game.run()
@@ -0,0 +1,252 @@
+import argparse
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from main import TICK_RATE, Game
+
+MAGIC = b"TDRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBQHB")
+FINAL_STATE = struct.Struct("<qqqq")
+FLAG_STRAIGHT_PATHS = 1
+FLAG_ENDLESS = 2
+
+OP_END = 0
+OP_BUILD = 1
+OP_UPGRADE = 2
+OP_HEAL = 3
+OP_NEXT_WAVE = 4
+OP_TARGET = 5
+COMMAND_OPS = {
+    "build": OP_BUILD,
+    "upgrade": OP_UPGRADE,
+    "heal": OP_HEAL,
+    "next_wave": OP_NEXT_WAVE,
+    "target": OP_TARGET,
+}
+OP_COMMANDS = {op: command for command, op in COMMAND_OPS.items()}
+
+
+@dataclass(frozen=True)
+class Command:
+    tick: int
+    command: str
+    coord: Optional[Tuple[int, int]] = None
+    tower_key: Optional[str] = None
+
+
+@dataclass
+class Replay:
+    seed: int
+    tick_rate: int
+    pathing: str
+    endless: bool
+    tower_keys: List[str]
+    commands: List[Command] = field(default_factory=list)
+    end_tick: int = 0
+    final_state: Optional[Tuple[int, int, int, int]] = None
+
+
+@dataclass
+class PlaybackResult:
+    ticks: int
+    elapsed: float
+    final_state: Tuple[int, int, int, int]
+    matches: Optional[bool]
+    window_ms: List[float]
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def final_state(game: Game) -> Tuple[int, int, int, int]:
+    return game.money, game.lives, game.kills, game.wave_manager.current_wave + 1
+
+
+def encode(replay: Replay) -> bytes:
+    flags = (FLAG_STRAIGHT_PATHS if replay.pathing == "line" else 0) | (FLAG_ENDLESS if replay.endless else 0)
+    out = bytearray(HEADER.pack(MAGIC, VERSION, replay.seed, replay.tick_rate, flags))
+    out.append(len(replay.tower_keys))
+    for key in replay.tower_keys:
+        encoded = key.encode("utf-8")
+        out.append(len(encoded))
+        out += encoded
+    key_index = {key: i for i, key in enumerate(replay.tower_keys)}
+    last_tick = 0
+    for command in replay.commands:
+        out.append(COMMAND_OPS[command.command])
+        write_varint(out, command.tick - last_tick)
+        last_tick = command.tick
+        if command.coord is not None:
+            out += struct.pack("<bb", *command.coord)
+        if command.command == "build":
+            out.append(key_index[command.tower_key])
+    out.append(OP_END)
+    write_varint(out, replay.end_tick - last_tick)
+    out += FINAL_STATE.pack(*(replay.final_state or (0, 0, 0, 0)))
+    return bytes(out)
+
+
+def decode(data: bytes) -> Replay:
+    magic, version, seed, tick_rate, flags = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a replay file")
+    if not 1 <= version <= VERSION:
+        raise ValueError(f"unsupported replay version {version}")
+    offset = HEADER.size
+    key_count = data[offset]
+    offset += 1
+    tower_keys = []
+    for _ in range(key_count):
+        length = data[offset]
+        tower_keys.append(data[offset + 1 : offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    replay = Replay(
+        seed=seed,
+        tick_rate=tick_rate,
+        pathing="line" if flags & FLAG_STRAIGHT_PATHS else "flow",
+        endless=bool(flags & FLAG_ENDLESS),
+        tower_keys=tower_keys,
+    )
+    tick = 0
+    while True:
+        op = data[offset]
+        delta, offset = read_varint(data, offset + 1)
+        tick += delta
+        if op == OP_END:
+            replay.end_tick = tick
+            replay.final_state = FINAL_STATE.unpack_from(data, offset)
+            return replay
+        coord = tower_key = None
+        if op != OP_NEXT_WAVE:
+            coord = struct.unpack_from("<bb", data, offset)
+            offset += 2
+        if op == OP_BUILD:
+            tower_key = tower_keys[data[offset]]
+            offset += 1
+        replay.commands.append(Command(tick, OP_COMMANDS[op], coord, tower_key))
+
+
+class ReplayRecorder:
+    def __init__(self, path: Path):
+        self.path = path
+        self.replay: Optional[Replay] = None
+
+    def begin(self, game: Game) -> None:
+        seed = random.randrange(1 << 32)
+        random.seed(seed)
+        self.replay = Replay(
+            seed=seed,
+            tick_rate=game.tick_rate,
+            pathing=game.pathing,
+            endless=game.endless,
+            tower_keys=list(game.tower_keys),
+        )
+
+    def record(
+        self, tick: int, command: str, coord: Optional[Tuple[int, int]] = None, tower_key: Optional[str] = None
+    ) -> None:
+        if self.replay is not None:
+            self.replay.commands.append(Command(tick, command, coord, tower_key))
+
+    def close(self, game: Game) -> None:
+        if self.replay is None:
+            return
+        self.replay.end_tick = game.tick_count
+        self.replay.final_state = final_state(game)
+        self.path.write_bytes(encode(self.replay))
+        self.replay = None
+
+
+def apply_command(game: Game, command: Command) -> None:
+    tile = game.hex_map.tiles.get(command.coord) if command.coord is not None else None
+    if command.command == "next_wave":
+        game.wave_manager.start_next_wave()
+    elif tile is None:
+        return
+    elif command.command == "build":
+        game.selected_tower_key = command.tower_key
+        game.try_build_tower(tile)
+    elif command.command == "upgrade":
+        if tile.tower is not None:
+            game.try_upgrade_tower(tile.tower)
+    elif command.command == "heal":
+        game.selected_tile = tile
+        game.try_heal_selected_tower()
+    elif command.command == "target":
+        game.try_cycle_targeting(tile)
+
+
+def play(replay: Replay, vectorized: bool = False, window: int = 0) -> PlaybackResult:
+    game = Game(
+        vectorized=vectorized,
+        headless=True,
+        pathing=replay.pathing,
+        endless=replay.endless,
+        tick_rate=replay.tick_rate,
+    )
+    random.seed(replay.seed)
+    game.start_game()
+    commands = iter(replay.commands)
+    pending = next(commands, None)
+    window_ms: List[float] = []
+    start = window_start = time.perf_counter()
+    while game.tick_count < replay.end_tick and game.state == "playing":
+        while pending is not None and pending.tick <= game.tick_count:
+            apply_command(game, pending)
+            pending = next(commands, None)
+        game.update(game.tick_dt)
+        if window and game.tick_count % window == 0:
+            now = time.perf_counter()
+            window_ms.append((now - window_start) / window * 1000)
+            window_start = now
+    elapsed = time.perf_counter() - start
+    state = final_state(game)
+    matches = None if replay.final_state is None else state == tuple(replay.final_state)
+    return PlaybackResult(game.tick_count, elapsed, state, matches, window_ms)
+
+
+def load(path: Path) -> Replay:
+    return decode(path.read_bytes())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded Hex Tower Defense session headlessly")
+    parser.add_argument("replay", type=Path)
+    parser.add_argument("--vectorized", action="store_true")
+    parser.add_argument("--window", type=int, default=TICK_RATE * 60, help="ticks per timing window (0 disables)")
+    args = parser.parse_args()
+    replay = load(args.replay)
+    result = play(replay, vectorized=args.vectorized, window=args.window)
+    for i, ms in enumerate(result.window_ms):
+        print(f"ticks {i * args.window:>8}-{(i + 1) * args.window:<8} {ms:>8.3f} ms/tick")
+    money, lives, kills, wave = result.final_state
+    print(
+        f"Replayed {result.ticks} ticks ({len(replay.commands)} commands) in {result.elapsed:.2f}s: "
+        f"wave {wave}, money {money}, lives {lives}, kills {kills}"
+    )
+    if result.matches is False:
+        print(f"Final state differs from the recording: {tuple(replay.final_state)}")
+
+
+if __name__ == "__main__":
+    main()
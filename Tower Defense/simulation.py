@@ -0,0 +1,165 @@
+import argparse
+import itertools
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from main import FPS, EnemyType, Game, TowerType, load_snapshot
+
+
+@dataclass(frozen=True)
+class BuildStep:
+    wave: int
+    coord: Tuple[int, int]
+    tower_key: str
+
+
+@dataclass
+class WaveOutcome:
+    wave: int
+    lives: int
+    money: int
+    kills: int
+    leaks: int
+    towers: int
+    duration: float
+
+
+class Simulation:
+    def __init__(
+        self,
+        build_order: Sequence[BuildStep] = (),
+        seed: Optional[int] = None,
+        dt: float = 1 / FPS,
+        vectorized: bool = False,
+        pathing: str = "flow",
+        max_wave_time: float = 3600.0,
+        tower_types: Optional[Dict[str, TowerType]] = None,
+        enemy_types: Optional[Dict[str, EnemyType]] = None,
+        snapshot: Optional[bytes] = None,
+    ):
+        self.build_order = sorted(build_order, key=lambda step: step.wave)
+        self.seed = seed
+        self.dt = dt
+        self.max_wave_time = max_wave_time
+        self.snapshot = snapshot
+        self.game = Game(vectorized=vectorized, headless=True, pathing=pathing)
+        if tower_types is not None:
+            self.game.tower_types = tower_types
+        if enemy_types is not None:
+            self.game.enemy_types = enemy_types
+        self.outcomes: List[WaveOutcome] = []
+
+    def apply_builds(self, wave_number: int) -> None:
+        game = self.game
+        for step in self.build_order:
+            if step.wave != wave_number:
+                continue
+            tile = game.hex_map.tiles.get(step.coord)
+            if tile is None or step.tower_key not in game.tower_types:
+                continue
+            game.selected_tower_key = step.tower_key
+            game.try_build_tower(tile)
+
+    def wait_for_cooldown(self) -> None:
+        wave_manager = self.game.wave_manager
+        while self.game.state == "playing" and wave_manager.cooldown_remaining > 0:
+            self.game.update(self.dt)
+
+    def play_wave(self) -> WaveOutcome:
+        game = self.game
+        wave_manager = game.wave_manager
+        wave_number = wave_manager.current_wave + 1
+        lives, kills = game.lives, game.kills
+        elapsed = 0.0
+        while game.state == "playing" and wave_manager.active and elapsed < self.max_wave_time:
+            game.update(self.dt)
+            elapsed += self.dt
+        return WaveOutcome(
+            wave=wave_number,
+            lives=game.lives,
+            money=game.money,
+            kills=game.kills - kills,
+            leaks=lives - game.lives,
+            towers=len(game.towers),
+            duration=elapsed,
+        )
+
+    def run(self, max_waves: Optional[int] = None) -> List[WaveOutcome]:
+        game = self.game
+        if self.snapshot is not None:
+            load_snapshot(game, self.snapshot)
+        else:
+            game.setup_gameplay()
+            game.state = "playing"
+        if self.seed is not None:
+            random.seed(self.seed)
+        self.outcomes = []
+        if game.wave_manager.active:
+            self.outcomes.append(self.play_wave())
+            if game.state != "playing" or game.wave_manager.active:
+                return self.outcomes
+        first_wave = game.wave_manager.current_wave + 2
+        total_waves = game.wave_manager.total_waves
+        if max_waves is not None:
+            total_waves = max_waves if total_waves is None else min(total_waves, max_waves)
+        wave_numbers = itertools.count(first_wave) if total_waves is None else range(first_wave, total_waves + 1)
+        for wave_number in wave_numbers:
+            self.wait_for_cooldown()
+            if game.state != "playing":
+                break
+            self.apply_builds(wave_number)
+            game.wave_manager.start_next_wave()
+            if not game.wave_manager.active:
+                break
+            self.outcomes.append(self.play_wave())
+            if game.state != "playing" or game.wave_manager.active:
+                break
+        return self.outcomes
+
+
+def load_build_order(path: Path) -> List[BuildStep]:
+    data: List[Dict] = json.loads(path.read_text(encoding="utf-8"))
+    return [BuildStep(int(item["wave"]), (int(item["coord"][0]), int(item["coord"][1])), item["tower"]) for item in data]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless Hex Tower Defense simulation")
+    parser.add_argument("--build-order", type=Path, help="JSON list of {wave, coord: [q, r], tower}")
+    parser.add_argument("--waves", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dt", type=float, default=1 / FPS)
+    parser.add_argument("--vectorized", action="store_true")
+    parser.add_argument("--pathing", choices=("flow", "line"), default="flow")
+    parser.add_argument("--snapshot", type=Path, help="start from a saved game snapshot")
+    parser.add_argument("--json", action="store_true", help="print outcomes as JSON")
+    args = parser.parse_args()
+    build_order = load_build_order(args.build_order) if args.build_order else []
+    simulation = Simulation(
+        build_order,
+        seed=args.seed,
+        dt=args.dt,
+        vectorized=args.vectorized,
+        pathing=args.pathing,
+        snapshot=args.snapshot.read_bytes() if args.snapshot else None,
+    )
+    start = time.perf_counter()
+    outcomes = simulation.run(args.waves)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps([asdict(outcome) for outcome in outcomes]))
+        return
+    print(f"{'wave':>5} {'lives':>6} {'money':>7} {'kills':>6} {'leaks':>6} {'towers':>7} {'time':>8}")
+    for outcome in outcomes:
+        print(
+            f"{outcome.wave:>5} {outcome.lives:>6} {outcome.money:>7} {outcome.kills:>6} "
+            f"{outcome.leaks:>6} {outcome.towers:>7} {outcome.duration:>7.1f}s"
+        )
+    print(f"Simulated {len(outcomes)} waves in {elapsed:.2f}s ({simulation.game.state})")
+
+
+if __name__ == "__main__":
+    main()